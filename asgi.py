@@ -0,0 +1,177 @@
+# Mode serving ASGI dengan route yang sama dengan main.py, untuk server ASGI seperti uvicorn:
+#
+#   uvicorn asgi:app --port 5000
+#   python benchmarks/loadtest.py --url http://127.0.0.1:5000
+#
+# Logika route (handlers) dan pembuatan graph dijalankan di executor thread, sedangkan dot
+# dijalankan lewat asyncio.create_subprocess_exec (AsyncRenderService), sehingga selama layout
+# berjalan event loop tetap menerima request lain. ASGI_EXECUTOR_WORKERS mengatur jumlah
+# thread executor dan ASGI_RENDER_WORKERS jumlah proses dot yang berjalan bersamaan.
+# ?profile= hanya tersedia di main.py.
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import handlers
+import metrics
+from nomor_2 import RegexSyntaxError
+from registry import UnknownAutomata, registry
+from render_service import AsyncRenderService, RenderBusy, RenderTimeout, RenderTooLarge
+from svg_cache import svg_cache
+
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('ASGI_EXECUTOR_WORKERS', 0)) or min(32, (os.cpu_count() or 1) + 4),
+    thread_name_prefix='automata')
+async_render_service = AsyncRenderService(int(os.environ.get('ASGI_RENDER_WORKERS', 0)) or None)
+
+
+async def run(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+
+# Di executor: handler route, lalu cek cache dan buat graph untuk svg yang belum ada
+def _prepare(handler, data):
+    payload, jobs = handler(data)
+    results = [job.cached() for job in jobs.values()]
+    graphs = {i: job.build_graph() for i, job in enumerate(jobs.values()) if results[i] is None}
+    return payload, jobs, results, graphs
+
+
+# Di executor: clean_svg / overlay hasil dot, simpan ke cache, lalu susun payload akhir
+def _finish(payload, jobs, results, outputs):
+    job_list = list(jobs.values())
+    for i, output in outputs.items():
+        results[i] = job_list[i].finish(output)
+    return handlers.resolve(payload, jobs, results)
+
+
+async def handle(handler, data):
+    payload, jobs, results, graphs = await run(_prepare, handler, data)
+    if not jobs:
+        return payload
+    outputs = await asyncio.gather(*(async_render_service.render(graph.source, 'svg', graph.engine)
+                                     for graph in graphs.values()))
+    return await run(_finish, payload, jobs, results, dict(zip(graphs, outputs)))
+
+
+# Status dan header yang sama dengan errorhandler di main.py; None untuk error lain (500)
+def error_response(error):
+    if isinstance(error, UnknownAutomata):
+        return 404, {'error': f'automata {error.args[0]} tidak ditemukan'}, []
+    if isinstance(error, RenderBusy):
+        return 503, {'error': str(error)}, [(b'retry-after', b'1')]
+    if isinstance(error, RenderTimeout):
+        return 504, {'error': str(error)}, []
+    if isinstance(error, RenderTooLarge):
+        return 413, {'error': str(error)}, []
+    if isinstance(error, RegexSyntaxError):
+        return 400, {'error': str(error)}, []
+    return None
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if message['type'] == 'http.disconnect' or not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_response(send, status, body, content_type=b'application/json', headers=()):
+    # header CORS sama dengan flask_cors pada main.py: semua origin diizinkan
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type),
+                    (b'content-length', str(len(body)).encode()),
+                    (b'access-control-allow-origin', b'*'),
+                    *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def json_body(payload):
+    return json.dumps(payload, sort_keys=True).encode('utf-8')
+
+
+async def dispatch(name, method, receive):
+    if name in handlers.ROUTES:
+        if method != 'POST':
+            return 405, json_body({'error': 'method tidak diizinkan'}), b'application/json', []
+        try:
+            data = json.loads(await read_body(receive))
+        except ValueError:
+            return 400, json_body({'error': 'body bukan json yang valid'}), b'application/json', []
+        return 200, json_body(await handle(handlers.ROUTES[name], data)), b'application/json', []
+
+    if name == 'metrics' and method == 'GET':
+        return 200, metrics.expose().encode('utf-8'), b'text/plain; version=0.0.4', []
+    if name == 'cache_stats' and method == 'GET':
+        stats = dict(svg_cache.stats(), render=async_render_service.stats(), registry=registry.stats())
+        return 200, json_body(stats), b'application/json', []
+    return 404, json_body({'error': 'route tidak ditemukan'}), b'application/json', []
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    start_time = time.perf_counter()
+    name = scope['path'].strip('/')
+    method = scope['method']
+
+    if method == 'OPTIONS':
+        request_headers = dict(scope['headers'])
+        await send_response(send, 200, b'', b'text/plain', [
+            (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+            (b'access-control-allow-headers', request_headers.get(b'access-control-request-headers', b'*')),
+        ])
+        return
+
+    try:
+        status, body, content_type, headers = await dispatch(name, method, receive)
+    except Exception as error:
+        response = error_response(error)
+        if response is None:
+            logger.exception('Exception on /%s [%s]', name, method)
+            response = 500, {'error': 'internal server error'}, []
+        status, payload, headers = response
+        body, content_type = json_body(payload), b'application/json'
+
+    await send_response(send, status, body, content_type, headers)
+    # nama endpoint sama dengan nama fungsi view di main.py
+    if name == 'metrics':
+        endpoint = 'metrics_endpoint'
+    elif name in handlers.ROUTES or name == 'cache_stats':
+        endpoint = name
+    else:
+        endpoint = 'unknown'
+    metrics.observe_request(endpoint, time.perf_counter() - start_time)
+
+
+if __name__ == '__main__':
+    # uvicorn hanya diperlukan untuk mode ini, bukan dependensi main.py
+    import uvicorn
+
+    uvicorn.run(app, host='127.0.0.1', port=int(os.environ.get('PORT', 5000)))
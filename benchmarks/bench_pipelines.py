@@ -0,0 +1,237 @@
+# Benchmark setiap pipeline pada input sintetis dengan seed yang sama, hasil dalam json.
+#
+#   python benchmarks/bench_pipelines.py --sizes 10 100 1000 --alphabets 2 16 --output hasil.json
+#   python benchmarks/bench_pipelines.py --only accepts_input minimize --no-svg
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generators
+from nomor_1 import NFA as TableNFA, convertToDFA, subset_construction
+from nomor_2 import constructTree, evalRegex, nomor_2_run, postfix, regexToDFA
+from nomor_3 import hopcroft_minimize, minimize_dfa
+from nomor_4 import equivalent, equivalent_with_witness
+from nomor_5 import create_automata, draw_path, make_svg
+from render_service import RenderError
+from svg_cache import svg_cache
+
+# batas jumlah state untuk benchmark yang kompleksitasnya kuadratik atau yang menjalankan graphviz
+LIMITS = {
+    'minimize_dfa': 300,
+    'equivalent': 300,
+    'convertToDFA': 200,
+    'nomor_2_run': 200,
+    'make_svg': 200,
+    'draw_path': 200,
+}
+# minimize_dfa (table filling lama) memeriksa setiap pasangan state dengan simbol * simbol^2
+# pasangan simbol, sehingga dibatasi dengan state^2 * simbol^3; equivalent hampir tidak
+# bertambah lambat dengan alfabet, cukup batas state
+COST_LIMITS = {
+    'minimize_dfa': 6000000,
+}
+SUBSET_MAX_STATES = 100000
+# convertToDFA juga merender DFA hasilnya, sehingga subset construction dibatasi lebih kecil
+RENDER_MAX_STATES = 500
+
+
+def measure(function, repeat, setup=None):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        svg_cache.clear()
+        # beberapa fungsi lama mencetak tabel/svg ke stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = function(argument) if setup is not None else function()
+            timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def record(results, benchmark, states, symbols, timings, **extra):
+    entry = {
+        'benchmark': benchmark,
+        'states': states,
+        'alphabet': symbols,
+        'repeat': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+    }
+    entry.update(extra)
+    results.append(entry)
+    print(f'{benchmark:<28}{states:>7}{symbols:>5}{entry["median"] * 1000:>12.3f} ms', file=sys.stderr)
+
+
+def skip(results, benchmark, states, symbols, reason):
+    results.append({'benchmark': benchmark, 'states': states, 'alphabet': symbols, 'skipped': reason})
+
+
+def bench_size(n, k, args, selected, results):
+    seed = args.seed
+    dfa_data = generators.random_dfa(n, k, seed)
+    nfa_data = generators.random_nfa(n, k, seed)
+    enfa_data = generators.random_enfa(n, k, seed)
+    symbols = generators.alphabet(k)
+    strings = generators.random_strings(symbols, args.strings, args.length, seed)
+    subset_data = dict(nfa_data, alphabet=symbols)
+
+    def allowed(name):
+        if name not in selected:
+            return False
+        if n > LIMITS.get(name, n):
+            skip(results, name, n, k, f'lebih dari {LIMITS[name]} state')
+            return False
+        if name in COST_LIMITS and n * n * k ** 3 > COST_LIMITS[name]:
+            skip(results, name, n, k, f'state^2 * simbol^3 lebih dari {COST_LIMITS[name]}')
+            return False
+        if not args.svg and name in ('convertToDFA', 'nomor_2_run', 'make_svg', 'draw_path'):
+            skip(results, name, n, k, 'svg dimatikan')
+            return False
+        return True
+
+    if allowed('create_automata'):
+        timings, _ = measure(lambda: create_automata(dfa_data), args.repeat)
+        record(results, 'create_automata', n, k, timings)
+
+    if allowed('subset_construction'):
+        timings, (dfa, complete) = measure(
+            lambda: subset_construction(TableNFA(subset_data), max_states=SUBSET_MAX_STATES), args.repeat)
+        record(results, 'subset_construction', n, k, timings, dfa_states=len(dfa.states), complete=complete)
+
+    if allowed('convertToDFA'):
+        try:
+            timings, _ = measure(lambda: convertToDFA(subset_data, max_states=RENDER_MAX_STATES), args.repeat)
+            record(results, 'convertToDFA', n, k, timings)
+        except RenderError as error:
+            skip(results, 'convertToDFA', n, k, str(error))
+
+    for name, data in (('DFA', dfa_data), ('NFA', nfa_data), ('ENFA', enfa_data)):
+        if allowed('compile'):
+            timings, _ = measure(lambda automata: automata.compile(), args.repeat, lambda: create_automata(data))
+            record(results, 'compile.' + name, n, k, timings)
+        if allowed('accepts_input'):
+            automata = create_automata(data)
+            automata.accepts_input(strings[0])
+            timings, _ = measure(lambda: [automata.accepts_input(string) for string in strings], args.repeat)
+            record(results, 'accepts_input.' + name, n, k, timings, strings=len(strings), length=args.length)
+
+    if allowed('minimize'):
+        timings, minimized = measure(hopcroft_minimize, args.repeat, lambda: create_automata(dfa_data))
+        record(results, 'minimize.hopcroft', n, k, timings, minimized_states=len(minimized.states))
+    if allowed('minimize_dfa'):
+        timings, minimized = measure(minimize_dfa, args.repeat, lambda: create_automata(dfa_data))
+        record(results, 'minimize_dfa', n, k, timings, minimized_states=len(minimized.states))
+
+    if allowed('equivalence'):
+        timings, _ = measure(lambda: equivalent_with_witness(create_automata(dfa_data), create_automata(dfa_data)),
+                             args.repeat)
+        record(results, 'equivalence.hopcroft_karp', n, k, timings)
+    if allowed('equivalent'):
+        timings, _ = measure(lambda: equivalent(create_automata(dfa_data), create_automata(dfa_data)), args.repeat)
+        record(results, 'equivalent', n, k, timings)
+
+    if allowed('make_svg'):
+        try:
+            timings, _ = measure(make_svg, args.repeat, lambda: create_automata(dfa_data))
+            record(results, 'make_svg', n, k, timings)
+        except RenderError as error:
+            skip(results, 'make_svg', n, k, str(error))
+    if allowed('draw_path'):
+        automata = create_automata(dfa_data)
+        trace = automata.trace(strings[0])
+        try:
+            timings, _ = measure(lambda: draw_path(automata, trace), args.repeat)
+            record(results, 'draw_path', n, k, timings, length=args.length)
+        except RenderError as error:
+            skip(results, 'draw_path', n, k, str(error))
+
+
+def bench_regex(n, k, args, selected, results):
+    # untuk regex, ukuran berarti jumlah operator
+    regex = generators.random_regex(n, k, args.seed)
+
+    if 'thompson' in selected:
+        timings, fa = measure(lambda: evalRegex(constructTree(postfix(regex))), args.repeat)
+        record(results, 'thompson', n, k, timings, nfa_states=len(fa))
+    if 'regex_to_dfa' in selected:
+        timings, dfa = measure(lambda: regexToDFA(constructTree(postfix(regex))), args.repeat)
+        record(results, 'regex_to_dfa', n, k, timings, dfa_states=len(dfa.states))
+    if 'nomor_2_run' in selected:
+        if not args.svg:
+            skip(results, 'nomor_2_run', n, k, 'svg dimatikan')
+        elif n > LIMITS['nomor_2_run']:
+            skip(results, 'nomor_2_run', n, k, f'lebih dari {LIMITS["nomor_2_run"]} operator')
+        else:
+            for engine in ('thompson', 'dfa'):
+                try:
+                    timings, _ = measure(lambda: nomor_2_run(regex, engine), args.repeat)
+                    record(results, 'nomor_2_run.' + engine, n, k, timings)
+                except RenderError as error:
+                    skip(results, 'nomor_2_run.' + engine, n, k, str(error))
+
+
+BENCHMARKS = ['create_automata', 'subset_construction', 'convertToDFA', 'compile', 'accepts_input', 'minimize',
+              'minimize_dfa', 'equivalence', 'equivalent', 'make_svg', 'draw_path', 'thompson', 'regex_to_dfa',
+              'nomor_2_run']
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--alphabets', type=int, nargs='+', default=[2, 16])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strings', type=int, default=100)
+    parser.add_argument('--length', type=int, default=100)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument('--no-svg', dest='svg', action='store_false')
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    selected = set(args.only)
+    results = []
+    for n in args.sizes:
+        for k in args.alphabets:
+            bench_size(n, k, args, selected, results)
+            bench_regex(n, k, args, selected, results)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'revision': git_revision(),
+            'arguments': vars(args),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
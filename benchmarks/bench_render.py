@@ -0,0 +1,57 @@
+# Membandingkan backend render graphviz (subprocess dot vs libgvc in-process).
+#
+#   python benchmarks/bench_render.py --states 5 20 80 --repeat 20
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from nomor_5 import DFA, _diagram
+from render_service import BACKENDS
+
+
+def ring_dfa(n):
+    states = ['q' + str(i) for i in range(n)]
+    transitions = {state: {'0': states[(i + 1) % n], '1': states[(i * 2) % n]} for i, state in enumerate(states)}
+    return DFA(states=set(states), input_symbols={'0', '1'}, transitions=transitions,
+               initial_state=states[0], final_states={states[-1]})
+
+
+def bench(backend, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend.render(data, 'svg', 'dot', 30.0)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--states', type=int, nargs='+', default=[5, 20, 80])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--backends', nargs='+', default=sorted(BACKENDS))
+    args = parser.parse_args()
+
+    backends = {}
+    for name in args.backends:
+        try:
+            backends[name] = BACKENDS[name]()
+        except OSError as error:
+            print(f'{name}: dilewati ({error})')
+
+    print(f'{"backend":<12}{"states":>8}{"mean ms":>10}{"p50 ms":>10}{"min ms":>10}')
+    for n in args.states:
+        data = _diagram(ring_dfa(n)).source.encode('utf-8')
+        for name, backend in backends.items():
+            backend.render(data, 'svg', 'dot', 30.0)
+            timings = bench(backend, data, args.repeat)
+            print(f'{name:<12}{n:>8}{statistics.mean(timings) * 1000:>10.2f}'
+                  f'{statistics.median(timings) * 1000:>10.2f}{min(timings) * 1000:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
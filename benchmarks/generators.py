@@ -0,0 +1,94 @@
+# Generator otomata dan regex acak dengan seed, dalam format json yang sama dengan
+# request endpoint (type, states, alphabet, transitions, start_state, accepting_states).
+import random
+import string
+
+
+SYMBOLS = string.ascii_lowercase + string.ascii_uppercase + string.digits + '@%'
+
+
+def alphabet(size):
+    if size > len(SYMBOLS):
+        raise ValueError(f'alphabet maksimal {len(SYMBOLS)} simbol')
+    return list(SYMBOLS[:size])
+
+
+def _states(n):
+    return ['q' + str(i) for i in range(n)]
+
+
+def _accepting(rng, states, ratio):
+    accepting = [state for state in states if rng.random() < ratio]
+    return accepting or [states[-1]]
+
+
+def random_dfa(n, k, seed=0, accepting_ratio=0.3):
+    rng = random.Random(seed)
+    states = _states(n)
+    symbols = alphabet(k)
+    transitions = {state: {symbol: [rng.choice(states)] for symbol in symbols} for state in states}
+    return {
+        'type': 'DFA',
+        'states': states,
+        'alphabet': symbols,
+        'transitions': transitions,
+        'start_state': states[0],
+        'accepting_states': _accepting(rng, states, accepting_ratio),
+    }
+
+
+def random_nfa(n, k, seed=0, branching=2, accepting_ratio=0.3):
+    rng = random.Random(seed)
+    states = _states(n)
+    symbols = alphabet(k)
+    transitions = {}
+    for state in states:
+        transitions[state] = {}
+        for symbol in symbols:
+            targets = rng.sample(states, rng.randint(0, min(branching, n)))
+            if targets:
+                transitions[state][symbol] = targets
+    return {
+        'type': 'NFA',
+        'states': states,
+        'alphabet': symbols,
+        'transitions': transitions,
+        'start_state': states[0],
+        'accepting_states': _accepting(rng, states, accepting_ratio),
+    }
+
+
+def random_enfa(n, k, seed=0, branching=2, epsilon_ratio=0.2, accepting_ratio=0.3):
+    data = random_nfa(n, k, seed, branching, accepting_ratio)
+    rng = random.Random(seed + 1)
+    for state in data['states']:
+        if rng.random() < epsilon_ratio:
+            data['transitions'][state][''] = [rng.choice(data['states'])]
+    data['type'] = 'ENFA'
+    return data
+
+
+# Regex dalam sintaks nomor_2 (+ union, * kleene, konkatenasi implisit) dengan kira-kira
+# `operators` operator. Dibangun iteratif supaya ukuran besar tidak melewati batas rekursi.
+# Simbol diambil dari huruf saja (paling banyak 52).
+def random_regex(operators, k, seed=0):
+    rng = random.Random(seed)
+    symbols = list(string.ascii_letters[:min(k, len(string.ascii_letters))])
+    parts = [rng.choice(symbols) for _ in range(operators + 1)]
+    while len(parts) > 1:
+        i = rng.randrange(len(parts) - 1)
+        left, right = parts[i], parts[i + 1]
+        choice = rng.random()
+        if choice < 0.45:
+            merged = left + right
+        elif choice < 0.8:
+            merged = '(' + left + '+' + right + ')'
+        else:
+            merged = '(' + left + right + ')*'
+        parts[i:i + 2] = [merged]
+    return parts[0]
+
+
+def random_strings(symbols, count, length, seed=0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(symbols) for _ in range(length)) for _ in range(count)]
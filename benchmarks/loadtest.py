@@ -0,0 +1,193 @@
+# Load test lokal: menjalankan main.app di server werkzeug (thread) lalu mengirim campuran
+# payload ke setiap endpoint dengan konkurensi tetap, melaporkan rps dan p50/p95/p99 per route.
+#
+#   python benchmarks/loadtest.py --concurrency 8 --duration 30
+#   python benchmarks/loadtest.py --mix nomor_5=5,nomor_3=2,draw_diagram=1 --states 20
+#   python benchmarks/loadtest.py --url http://127.0.0.1:5000 --output hasil.json
+import argparse
+import contextlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generators
+
+DEFAULT_MIX = 'draw_diagram=1,nomor_1=1,nomor_2=1,nomor_3=2,nomor_4=1,nomor_5=4'
+
+
+# Beberapa varian payload per route (seed berbeda), supaya cache svg tidak selalu kena
+def build_payloads(states, symbols, variants, length):
+    payloads = {route: [] for route in ('draw_diagram', 'nomor_1', 'nomor_2', 'nomor_3', 'nomor_4', 'nomor_5')}
+    for seed in range(variants):
+        dfa = generators.random_dfa(states, symbols, seed)
+        nfa = generators.random_nfa(min(states, 8), symbols, seed)
+        string = generators.random_strings(dfa['alphabet'], 1, length, seed)[0]
+        payloads['draw_diagram'].append(dfa)
+        payloads['nomor_1'].append(dict(nfa, max_states=200))
+        payloads['nomor_2'].append({'regexp': generators.random_regex(states, symbols, seed)})
+        payloads['nomor_3'].append(dict(dfa, strings=string))
+        payloads['nomor_4'].append({'dfa1': dfa, 'dfa2': generators.random_dfa(states, symbols, seed + variants)})
+        payloads['nomor_5'].append(dict(generators.random_enfa(states, symbols, seed), strings=string))
+    return payloads
+
+
+def parse_mix(mix):
+    routes, weights = [], []
+    for part in mix.split(','):
+        route, _, weight = part.partition('=')
+        routes.append(route.strip())
+        weights.append(float(weight or 1))
+    return routes, weights
+
+
+def start_server():
+    from werkzeug.serving import make_server
+    from main import app
+
+    # log per request dari werkzeug hanya menambah beban pada server yang diuji
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='loadtest-server', daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def send(url, route, payload, timeout):
+    data = json.dumps(payload).encode('utf-8')
+    request = urllib.request.Request(f'{url}/{route}', data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    # nearest-rank
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, statuses, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for status in statuses if status is None or status >= 400),
+        'statuses': {str(status): statuses.count(status) for status in sorted(set(statuses), key=str)},
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else None,
+    }
+
+
+def run(url, payloads, routes, weights, concurrency, duration, requests, timeout, seed):
+    results = {route: ([], []) for route in routes}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    counter = iter(range(requests)) if requests else None
+
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        while True:
+            if counter is not None:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+            elif time.perf_counter() >= deadline:
+                return
+            route = rng.choices(routes, weights)[0]
+            status, latency = send(url, route, rng.choice(payloads[route]), timeout)
+            with lock:
+                results[route][0].append(latency)
+                results[route][1].append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for latencies, _ in results.values() for latency in latencies]
+    all_statuses = [status for _, statuses in results.values() for status in statuses]
+    return {
+        'elapsed': elapsed,
+        'total': summarize(all_latencies, all_statuses, elapsed),
+        'routes': {route: summarize(latencies, statuses, elapsed) for route, (latencies, statuses) in results.items()},
+    }
+
+
+def print_report(report):
+    def ms(value):
+        return '-' if value is None else f'{value * 1000:.1f}'
+
+    print(f'{"route":<14}{"req":>7}{"err":>6}{"rps":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}', file=sys.stderr)
+    rows = list(report['routes'].items()) + [('total', report['total'])]
+    for route, stats in rows:
+        print(f'{route:<14}{stats["requests"]:>7}{stats["errors"]:>6}{stats["rps"]:>9.1f}'
+              f'{ms(stats["p50"]):>10}{ms(stats["p95"]):>10}{ms(stats["p99"]):>10}', file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='server yang sudah berjalan; tanpa ini main.app dijalankan lokal')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--requests', type=int, help='jumlah request total, menggantikan --duration')
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--states', type=int, default=8)
+    parser.add_argument('--alphabet', type=int, default=2)
+    parser.add_argument('--variants', type=int, default=4)
+    parser.add_argument('--length', type=int, default=20)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    routes, weights = parse_mix(args.mix)
+    payloads = build_payloads(args.states, args.alphabet, args.variants, args.length)
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server()
+
+    try:
+        # print diagnostik dari pipeline (svg, tabel) dibuang supaya stdout hanya berisi laporan
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if server else sys.stdout):
+            report = run(url, payloads, routes, weights, args.concurrency, args.duration, args.requests,
+                         args.timeout, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report['arguments'] = vars(args)
+    print_report(report)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import re
+
+from nomor_1 import nomor_1_run, convertToDFA_jobs
+from nomor_2 import nomor_2_run, nomor_2_jobs, compile_regex, RegexSyntaxError
+from nomor_3 import nomor_3_run
+from nomor_4 import nomor_4_run
+from nomor_5 import create_automata, make_svg_jobs, make_graph, draw_path_jobs, accepts_batch
+from registry import registry
+
+
+# Logika setiap route, dipakai bersama oleh main.py (Flask) dan asgi.py (ASGI).
+# Handler menerima body json request dan mengembalikan (payload, jobs): payload berisi field
+# respon yang sudah jadi, jobs memetakan nama field svg ke RenderJob yang belum dirender.
+# main.py merender jobs dengan render_jobs, asgi.py lewat subprocess asyncio.
+
+
+# Otomata bisa dikirim lengkap atau cukup id hasil /register
+def load_automata(data):
+    if 'id' in data:
+        return registry.get(data['id'])
+    return create_automata(data)
+
+
+def register(data):
+    return {'id': registry.register(data)}, {}
+
+
+def draw_diagram(data):
+    # format 'json': graph ringkas tanpa graphviz, untuk klien yang melakukan layout sendiri
+    if data.get('format') == 'json':
+        return {'graph': make_graph(load_automata(data))}, {}
+    if 'id' in data:
+        return {}, {'svgResult': registry.layout_job(data['id'])}
+    return {}, {'svgResult': make_svg_jobs([create_automata(data)])[0]}
+
+
+def nomor_1(data):
+    if data.get('format') == 'json':
+        graph1, graph2, complete = nomor_1_run(data, data.get('max_states'), data.get('time_limit'), 'json')
+        return {'graph1': graph1, 'graph2': graph2, 'complete': complete}, {}
+    nfa_job, dfa_job = convertToDFA_jobs(data, data.get('max_states'), data.get('time_limit'))
+    # 'complete' baru diketahui setelah job DFA dijalankan (subset construction dilewati bila
+    # svg-nya ada di cache), sehingga dibaca saat respon dibuat
+    return {'complete': lambda: dfa_job.complete}, {'result1': nfa_job, 'result2': dfa_job}
+
+
+# Payload akhir: nilai berupa fungsi dipanggil setelah render, lalu svg dimasukkan per nama field
+def resolve(payload, jobs, svgs):
+    payload = {key: value() if callable(value) else value for key, value in payload.items()}
+    payload.update(zip(jobs, svgs))
+    return payload
+
+
+def nomor_2(data):
+    input_regex = data['regexp']
+    engine = data.get('engine', 'thompson')
+    minimize = data.get('minimize', False)
+    if data.get('format') == 'json':
+        return {'graph': nomor_2_run(input_regex, engine, minimize, 'json')}, {}
+    return {}, {'svgResult': nomor_2_jobs(input_regex, engine, minimize)[0]}
+
+
+def nomor_3(data):
+    strings = data['strings']
+    overlay = data.get('overlay', False)
+
+    initial_dfa = load_automata(data)
+    trace1 = initial_dfa.trace(strings)
+    result1 = trace1.accepted
+
+    # mode explain: langkah table filling dikirim ke klien sebagai 'explanation'
+    explain = data.get('explain', False)
+    explanation = {} if explain else None
+    if 'id' in data and not explain:
+        minimized_dfa = registry.minimized(data['id'])
+    else:
+        minimized_dfa = nomor_3_run(initial_dfa, explain, explanation)
+    trace2 = minimized_dfa.trace(strings)
+    result2 = trace2.accepted
+
+    payload = {'result1': f'{result1}', 'result2': f'{result2}'}
+    if explain:
+        payload['explanation'] = explanation
+    if data.get('format') == 'json':
+        payload.update(graph1=make_graph(initial_dfa, trace1), graph2=make_graph(minimized_dfa, trace2))
+        return payload, {}
+
+    # kedua svg dirender paralel
+    job1, job2 = draw_path_jobs([initial_dfa, minimized_dfa], [trace1, trace2], overlay)
+    return payload, {'svgResult1': job1, 'svgResult2': job2}
+
+
+def nomor_4(data):
+    dfa1 = data["dfa1"]
+    dfa2 = data["dfa2"]
+    if 'id' in dfa1:
+        dfa1 = registry.get(dfa1['id'])
+    if 'id' in dfa2:
+        dfa2 = registry.get(dfa2['id'])
+    result, witness = nomor_4_run(dfa1, dfa2, data.get('engine', 'hopcroft_karp'))
+    return {'result': f'{result}', 'witness': witness}, {}
+
+
+def nomor_5(data):
+    if data.get('type') == "REGEX":
+        regex = data['start_state']
+        strings = data['strings']
+        # engine 'automaton': pola dikompilasi lewat pipeline nomor_2 dan dicocokkan dengan lazy DFA
+        if data.get('engine', 're') == 'automaton':
+            matcher = compile_regex(regex)
+            fullmatch = matcher.accepts
+        else:
+            try:
+                regex = re.compile(regex)
+            except re.error as error:
+                raise RegexSyntaxError(f'regex tidak valid: {error}') from None
+            fullmatch = lambda string: regex.fullmatch(string) is not None
+        if isinstance(strings, list):
+            return {'result': [fullmatch(string) for string in strings]}, {}
+        return {'result': f'{fullmatch(strings)}'}, {}
+
+    automata = load_automata(data)
+    strings = data['strings']
+    # mode batch: strings berupa list, tanpa render svg
+    if isinstance(strings, list):
+        return {'result': accepts_batch(automata, strings)}, {}
+    trace = automata.trace(strings)
+    result = trace.accepted
+    if data.get('format') == 'json':
+        return {'graph': make_graph(automata, trace), 'result': f'{result}'}, {}
+    return {'result': f'{result}'}, {'svgResult': draw_path_jobs([automata], [trace], data.get('overlay', False))[0]}
+
+
+ROUTES = {
+    'register': register,
+    'draw_diagram': draw_diagram,
+    'nomor_1': nomor_1,
+    'nomor_2': nomor_2,
+    'nomor_3': nomor_3,
+    'nomor_4': nomor_4,
+    'nomor_5': nomor_5,
+}
@@ -1,88 +1,141 @@
-from nomor_1 import nomor_1_run
-from nomor_2 import nomor_2_run
-from nomor_3 import nomor_3_run
-from nomor_4 import nomor_4_run
-from nomor_5 import create_automata, make_svg, draw_path, DFA, ENFA
-from flask import Flask, request, jsonify
+from nomor_2 import RegexSyntaxError
+from nomor_5 import render_jobs
+from registry import UnknownAutomata, registry
+from render_service import render_service, RenderBusy, RenderTimeout, RenderTooLarge
+from svg_cache import svg_cache
+import handlers
+import metrics
+import profiling
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import re
+import json
+import os
+import time
 
 
 app = Flask(__name__)
 CORS(app)
+# ?profile=1 (ringkasan cProfile) atau ?profile=stacks (collapsed stack ke PROFILE_DIR)
+# hanya aktif bila PROFILING=1; nilai lain (misalnya ?profile=0) diabaikan
+app.config['PROFILING'] = os.environ.get('PROFILING', '0') == '1'
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', 'profiles')
+
+
+@app.before_request
+def start_timer():
+    g.start_time = time.perf_counter()
+
+
+@app.before_request
+def start_profile():
+    mode = request.args.get('profile')
+    if app.config['PROFILING'] and mode in ('1', 'stacks'):
+        g.profile = profiling.start(mode)
+
+
+@app.after_request
+def attach_profile(response):
+    capture = g.pop('profile', None)
+    if capture is not None:
+        result = profiling.finish(capture, request.endpoint or 'unknown', app.config['PROFILE_DIR'])
+        if response.is_json:
+            data = response.get_json()
+            data['profile'] = result
+            response.set_data(json.dumps(data))
+    return response
+
+
+# after_request dilewati bila exception diteruskan (PROPAGATE_EXCEPTIONS, app.run(debug=True)),
+# sehingga profiler yang masih berjalan dihentikan dan lock-nya dilepas di sini
+@app.teardown_request
+def stop_profile(error=None):
+    capture = g.pop('profile', None)
+    if capture is not None:
+        profiling.finish(capture, request.endpoint or 'unknown', app.config['PROFILE_DIR'])
+
+
+@app.after_request
+def record_duration(response):
+    if 'start_time' in g:
+        metrics.observe_request(request.endpoint or 'unknown', time.perf_counter() - g.start_time)
+    return response
+
+
+# Logika route ada di handlers; svg dari handler dirender paralel lewat render_service
+def respond(handler):
+    payload, jobs = handler(request.json)
+    return jsonify(handlers.resolve(payload, jobs, render_jobs(list(jobs.values()))))
+
+
+@app.errorhandler(UnknownAutomata)
+def unknown_automata(error):
+    return jsonify({'error': f'automata {error.args[0]} tidak ditemukan'}), 404
+
+
+# Regex yang tidak bisa di-parse; ValueError lain tetap 500 karena berarti bug
+@app.errorhandler(RegexSyntaxError)
+def invalid_input(error):
+    return jsonify({'error': str(error)}), 400
+
+
+@app.errorhandler(RenderBusy)
+def render_busy(error):
+    return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+
+
+@app.errorhandler(RenderTimeout)
+def render_timeout(error):
+    return jsonify({'error': str(error)}), 504
+
+
+@app.errorhandler(RenderTooLarge)
+def render_too_large(error):
+    return jsonify({'error': str(error)}), 413
+
+
+@app.route('/register', methods=['POST'])
+def register():
+    return respond(handlers.register)
 
 
 @app.route('/draw_diagram', methods=['POST'])
 def draw_diagram():
-    data = request.json
-    automata = create_automata(data)
-    svg_result = make_svg(automata)
-    return jsonify({'svgResult': svg_result})
+    return respond(handlers.draw_diagram)
 
 
 @app.route('/nomor_1', methods=['POST'])
 def nomor_1():
-    data = request.json
-    svg1, svg2 = nomor_1_run(data)
-    return jsonify({'result1': f'{svg1}', 'result2': f'{svg2}'})
+    return respond(handlers.nomor_1)
 
 
 @app.route('/nomor_2', methods=['POST'])
 def nomor_2():
-    data = request.json
-    input_regex = data['regexp']
-    svg_result = nomor_2_run(input_regex)
-    return jsonify({'svgResult': svg_result})
+    return respond(handlers.nomor_2)
 
 
 @app.route('/nomor_3', methods=['POST'])
 def nomor_3():
-    data = request.json
-    strings = data['strings']
-
-    initial_dfa = create_automata(data)
-    result1 = initial_dfa.accepts_input(strings)
-    svg_result1 = draw_path(initial_dfa)
-
-    minimized_dfa = nomor_3_run(initial_dfa)
-    result2 = minimized_dfa.accepts_input(strings)
-    svg_result2 = draw_path(minimized_dfa)
-
-    return jsonify({'svgResult1': f'{svg_result1}', 'svgResult2': f'{svg_result2}', 'result1': f'{result1}', 'result2': f'{result2}'})
+    return respond(handlers.nomor_3)
 
 
 @app.route('/nomor_4', methods=['POST'])
 def nomor_4():
-    data = request.json
-    dfa1 = data["dfa1"]
-    dfa2 = data["dfa2"]
-    result = nomor_4_run(dfa1, dfa2)
-    return jsonify({'result': f'{result}'})
+    return respond(handlers.nomor_4)
 
 
 @app.route('/nomor_5', methods=['POST'])
 def nomor_5():
-    data = request.json
-    if data['type'] == "REGEX":
-        regex = data['start_state']
-        strings = data['strings']
-        regex = re.compile(regex)
-        result = ""
-        if regex.fullmatch(strings):
-            result = True
-        else:
-            result = False
-        return jsonify({'result': f'{result}'})
-    else:
-        automata = create_automata(data)
-        strings = data['strings']
-        result= automata.accepts_input(strings)
-        svg_result = draw_path(automata)
-        # if isinstance(automata, ENFA):
-        #     svg_result = make_svg(automata)
-        # else:
-        #     svg_result = draw_path(automata)
-        return jsonify({'svgResult': svg_result, 'result': f'{result}'})
+    return respond(handlers.nomor_5)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.expose(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    return jsonify(dict(svg_cache.stats(), render=render_service.stats(), registry=registry.stats()))
 
 
 if __name__ == '__main__':
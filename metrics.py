@@ -0,0 +1,126 @@
+import bisect
+import os
+import threading
+import time
+
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 100000)
+
+
+class Histogram:
+    def __init__(self, name, documentation, label, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_value, (counts, total, count) in sorted(self._series.items()):
+                label = f'{self.label}="{_escape(label_value)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{label}}} {total}')
+                lines.append(f'{self.name}_count{{{label}}} {count}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+stage_duration = Histogram('automata_stage_duration_seconds', 'Durasi setiap tahap pipeline.',
+                           'stage', DURATION_BUCKETS)
+stage_states = Histogram('automata_stage_states', 'Jumlah state otomata yang diproses setiap tahap.',
+                         'stage', SIZE_BUCKETS)
+stage_transitions = Histogram('automata_stage_transitions', 'Jumlah transisi otomata yang diproses setiap tahap.',
+                              'stage', SIZE_BUCKETS)
+stage_input_length = Histogram('automata_stage_input_length', 'Panjang input (string, regex, svg) setiap tahap.',
+                               'stage', SIZE_BUCKETS)
+request_duration = Histogram('http_request_duration_seconds', 'Durasi request per endpoint.',
+                             'endpoint', DURATION_BUCKETS)
+HISTOGRAMS = [stage_duration, stage_states, stage_transitions, stage_input_length, request_duration]
+
+# METRICS=0 mematikan pengukuran; span() lalu hanya mengembalikan objek no-op yang sama
+enabled = os.environ.get('METRICS', '1') != '0'
+
+
+class _Span:
+    __slots__ = ('name', 'automata', 'input_length', 'start')
+
+    def __init__(self, name, automata, input_length):
+        self.name = name
+        self.automata = automata
+        self.input_length = input_length
+
+    def set(self, automata=None, input_length=None):
+        if automata is not None:
+            self.automata = automata
+        if input_length is not None:
+            self.input_length = input_length
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        stage_duration.observe(self.name, time.perf_counter() - self.start)
+        if self.automata is not None:
+            # size() di-cache per otomata, sehingga span tidak menelusuri transitions
+            states, transitions = self.automata.size()
+            stage_states.observe(self.name, states)
+            stage_transitions.observe(self.name, transitions)
+        if self.input_length is not None:
+            stage_input_length.observe(self.name, self.input_length)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, automata=None, input_length=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+# with span('minimize', automata=dfa): ... mencatat durasi, ukuran otomata dan panjang input;
+# hasil yang baru diketahui di dalam blok bisa dicatat dengan span.set(automata=...)
+def span(name, automata=None, input_length=None):
+    if not enabled:
+        return _NOOP_SPAN
+    return _Span(name, automata, input_length)
+
+
+def observe_request(endpoint, duration):
+    if enabled:
+        request_duration.observe(endpoint, duration)
+
+
+def expose():
+    return '\n'.join(histogram.expose() for histogram in HISTOGRAMS) + '\n'
@@ -1,5 +1,9 @@
-from bs4 import BeautifulSoup
+from collections import deque
 from graphviz import Digraph
+from nomor_5 import DFA, ENFA, RenderJob, make_graph, render_jobs
+from metrics import span
+from svg_cache import make_key
+import time
 
 class NFA:
     def __init__(self, data):
@@ -8,12 +12,18 @@ class NFA:
         self.start = data["start_state"]
         self.finals = data["accepting_states"]
         self.transition_table = {}
+        self.transition_count = 0
 
         # Initialize transition table
         for state, transitions in data["transitions"].items():
             self.transition_table[state] = {}
             for symbol, next_states in transitions.items():
                 self.transition_table[state][symbol] = next_states
+                self.transition_count += len(next_states)
+
+    # (jumlah state, jumlah transisi) untuk metrics
+    def size(self):
+        return len(self.states), self.transition_count
 
     def getEpsilonClosure(self, state):
         closure = set()
@@ -32,12 +42,79 @@ class NFA:
         return closure
 
     def getStateName(self, state_list):
-        return ''.join(sorted(state_list))
+        # nama dengan pemisah, supaya {q1, q12} dan {q11, q2} tidak bertabrakan
+        return '{' + ','.join(sorted(state_list)) + '}'
 
     def isFinalDFA(self, state_list):
         return any(state in self.finals for state in state_list)
 
-def convertToDFA(input_nfa):
+def toENFA(nfa):
+    return ENFA(states=set(nfa.states),
+                input_symbols=set(nfa.alphabets),
+                transitions={state: {symbol: set(next_states) for symbol, next_states in transitions.items()}
+                             for state, transitions in nfa.transition_table.items()},
+                initial_state=nfa.start,
+                final_states=set(nfa.finals))
+
+
+def subset_construction(nfa, max_states=None, time_limit=None):
+    with span('subset_construction', automata=nfa):
+        return _subset_construction(nfa, max_states, time_limit)
+
+
+def _subset_construction(nfa, max_states=None, time_limit=None):
+    # Subset construction dengan himpunan state berupa bitset dari nomor_5.CompiledNFA.
+    # Setiap himpunan diberi id integer sekali saja, worklist memakai deque.
+    # Bila max_states atau time_limit (detik) terlampaui, konstruksi berhenti dan
+    # DFA parsial dikembalikan dengan complete = False.
+    compiled = toENFA(nfa).compile()
+    alphabet = [symbol for symbol in nfa.alphabets if symbol in compiled.symbol_ids]
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+    state_ids = {compiled.initial: 0}
+    names = [nfa.getStateName(compiled.names(compiled.initial))]
+    transitions = {names[0]: {}}
+    final_states = set()
+    if compiled.initial & compiled.accepting:
+        final_states.add(names[0])
+
+    worklist = deque([compiled.initial])
+    complete = True
+    while worklist:
+        if (max_states is not None and len(names) > max_states) or \
+                (deadline is not None and time.perf_counter() > deadline):
+            complete = False
+            break
+        mask = worklist.popleft()
+        name = names[state_ids[mask]]
+
+        for symbol in alphabet:
+            to_mask = compiled.step(mask, compiled.symbol_ids[symbol])
+            if not to_mask:
+                if 'ϕ' not in transitions:
+                    transitions['ϕ'] = {alpha: 'ϕ' for alpha in nfa.alphabets}
+                transitions[name][symbol] = 'ϕ'
+                continue
+
+            if to_mask not in state_ids:
+                state_ids[to_mask] = len(names)
+                to_name = nfa.getStateName(compiled.names(to_mask))
+                names.append(to_name)
+                transitions[to_name] = {}
+                if to_mask & compiled.accepting:
+                    final_states.add(to_name)
+                worklist.append(to_mask)
+            transitions[name][symbol] = names[state_ids[to_mask]]
+
+    dfa = DFA(states=set(transitions),
+              input_symbols=set(nfa.alphabets),
+              transitions=transitions,
+              initial_state=names[0],
+              final_states=final_states)
+    return dfa, complete
+
+
+def convertToDFA(input_nfa, max_states=None, time_limit=None):
 
     data_test = {
         "type": "NFA",
@@ -53,8 +130,43 @@ def convertToDFA(input_nfa):
         "strings": "110"
     }
 
+    jobs = convertToDFA_jobs(input_nfa, max_states, time_limit)
+    cleaned_svg_nfa, cleaned_svg_dfa = render_jobs(jobs)
+
+    return cleaned_svg_nfa, cleaned_svg_dfa, jobs[1].complete
+
+
+# Job render DFA: subset construction baru dijalankan bila svg-nya tidak ada di cache,
+# dan hanya DFA yang selesai dibangun yang disimpan di cache
+class DFARenderJob(RenderJob):
+    __slots__ = ('nfa', 'max_states', 'time_limit', 'complete')
+
+    def __init__(self, key, nfa, max_states=None, time_limit=None):
+        super().__init__(key, self._build_graph)
+        self.nfa = nfa
+        self.max_states = max_states
+        self.time_limit = time_limit
+        self.complete = True
+
+    def _build_graph(self):
+        dfa, self.complete = subset_construction(self.nfa, self.max_states, self.time_limit)
+        if not self.complete:
+            self.key = None
+        return dfa_diagram(dfa)
+
+
+def convertToDFA_jobs(input_nfa, max_states=None, time_limit=None):
     nfa = NFA(input_nfa)
 
+    definition = [nfa.states, nfa.alphabets, nfa.transition_table, nfa.start, nfa.finals]
+    nfa_key = make_key('convertToDFA.nfa', *definition)
+    dfa_key = make_key('convertToDFA.dfa', max_states, *definition)
+
+    return [RenderJob(nfa_key, lambda: nfa_diagram(nfa)),
+            DFARenderJob(dfa_key, nfa, max_states, time_limit)]
+
+
+def nfa_diagram(nfa):
     nfa.graph = Digraph()
 
     for state in nfa.states:
@@ -76,84 +188,34 @@ def convertToDFA(input_nfa):
                 else:
                     nfa.graph.edge(state, next_state, label='ε')
 
-    svg_nfa = nfa.graph.pipe(format='svg').decode('utf-8')
-    print(svg_nfa)
-
-    dfa = Digraph()
-
-    epsilon_closure = {}
-    for state in nfa.states:
-        epsilon_closure[state] = nfa.getEpsilonClosure(state)
-
-    dfa_stack = [epsilon_closure[nfa.start]]
-
-    if nfa.isFinalDFA(dfa_stack[0]):
-        dfa.attr('node', shape='doublecircle')
-    else:
-        dfa.attr('node', shape='circle')
-    dfa.node(nfa.getStateName(dfa_stack[0]))
+    return nfa.graph
 
-    dfa.attr('node', shape='none')
-    dfa.node('')
-    dfa.edge('', nfa.getStateName(dfa_stack[0]))
 
-    dfa_states = [epsilon_closure[nfa.start]]
+def dfa_diagram(dfa):
+    graph = Digraph()
 
-    while dfa_stack:
-        cur_state = dfa_stack.pop(0)
-
-        for symbol in nfa.alphabets:
-            from_closure = set()
-            for state in cur_state:
-                if symbol in nfa.transition_table[state]:
-                    from_closure.update(nfa.transition_table[state][symbol])
-
-            if from_closure:
-                to_state = set()
-                for state in from_closure:
-                    to_state.update(epsilon_closure[state])
-
-                if to_state not in dfa_states:
-                    dfa_stack.append(to_state)
-                    dfa_states.append(to_state)
-
-                    if nfa.isFinalDFA(list(to_state)):
-                        dfa.attr('node', shape='doublecircle')
-                    else:
-                        dfa.attr('node', shape='circle')
-                    dfa.node(nfa.getStateName(list(to_state)))
-
-                dfa.edge(nfa.getStateName(cur_state), nfa.getStateName(list(to_state)), label=symbol)
-            else:
-                if (-1) not in dfa_states:
-                    dfa.attr('node', shape='circle')
-                    dfa.node('ϕ')
-
-                    for alpha in nfa.alphabets:
-                        dfa.edge('ϕ', 'ϕ', label=alpha)
-
-                    dfa_states.append(-1)
-
-                dfa.edge(nfa.getStateName(cur_state), 'ϕ', label=symbol)
-
-
-    svg_dfa = dfa.pipe(format='svg').decode('utf-8')
-    print(svg_dfa)
-
-    soup = BeautifulSoup(svg_nfa, 'html.parser')
-    for tag in soup.find_all():
-        tag.attrs = {key.split(':')[-1]: value for key, value in tag.attrs.items()}
-        tag.name = tag.name.split(':')[-1]
-    cleaned_svg_nfa = str(soup)
-
-    soup = BeautifulSoup(svg_dfa, 'html.parser')
-    for tag in soup.find_all():
-        tag.attrs = {key.split(':')[-1]: value for key, value in tag.attrs.items()}
-        tag.name = tag.name.split(':')[-1]
-    cleaned_svg_dfa = str(soup)
-
-    return cleaned_svg_nfa, cleaned_svg_dfa
-
-
-def nomor_1_run(input_nfa):
-    return convertToDFA(input_nfa)
+    # urutan state mengikuti urutan ditemukan saat subset construction
+    for state in dfa.transitions:
+        if state in dfa.final_states:
+            graph.attr('node', shape='doublecircle')
+        else:
+            graph.attr('node', shape='circle')
+        graph.node(state)
+
+    graph.attr('node', shape='none')
+    graph.node('')
+    graph.edge('', dfa.initial_state)
+
+    for state, transitions in dfa.transitions.items():
+        for symbol, next_state in transitions.items():
+            graph.edge(state, next_state, label=symbol)
+
+    return graph
+
+def nomor_1_run(input_nfa, max_states=None, time_limit=None, format='svg'):
+    # format 'json': graph NFA dan DFA langsung dari strukturnya, tanpa graphviz
+    if format == 'json':
+        nfa = NFA(input_nfa)
+        dfa, complete = subset_construction(nfa, max_states, time_limit)
+        return make_graph(toENFA(nfa)), make_graph(dfa), complete
+    return convertToDFA(input_nfa, max_states, time_limit)
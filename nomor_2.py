@@ -1,4 +1,12 @@
 import graphviz
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict, deque
+from nomor_3 import hopcroft_minimize
+from nomor_5 import DFA, ENFA, RenderJob, make_graph, make_svg_jobs, render_jobs
+from metrics import span
 from flask import Flask
 from flask_cors import CORS
 
@@ -16,6 +24,7 @@ class Type:
 
 # Kelas untuk merepresentasikan node dalam pohon ekspresi
 class ExpressionTree:
+    __slots__ = ('_type', 'value', 'left', 'right')
 
     def __init__(self, _type, value=None):
         self._type = _type
@@ -23,27 +32,46 @@ class ExpressionTree:
         self.left = None
         self.right = None
 
-# Fungsi untuk membangun pohon ekspresi dari ekspresi reguler
+REGEX_OPERATORS = set('+.*()')
+
+
+# Regex yang tidak bisa di-parse (atau terlalu panjang); main.py dan asgi.py menjawabnya dengan 400
+class RegexSyntaxError(ValueError):
+    pass
+
+
+# Simbol regex: huruf atau angka
+def isSymbol(c):
+    return c.isalpha() or c.isdigit()
+
+
+# Fungsi untuk membangun pohon ekspresi dari ekspresi reguler (postfix).
+# Operator yang kekurangan operand atau sisa operand berlebih berarti regex tidak valid (RegexSyntaxError).
 def constructTree(regexp):
-    global z
     stack = []
     for c in regexp:
-        if c.isalpha() or c.isdigit():
+        if isSymbol(c):
             stack.append(ExpressionTree(Type.SYMBOL, c))
+            continue
+        if c not in "+.*":
+            raise RegexSyntaxError(f'karakter tidak didukung pada regex: {c!r}')
+        if len(stack) < (1 if c == "*" else 2):
+            raise RegexSyntaxError(f'operator {c!r} pada regex kekurangan operand')
+        if c == "+":
+            z = ExpressionTree(Type.UNION)
+            z.right = stack.pop()
+            z.left = stack.pop()
+        elif c == ".":
+            z = ExpressionTree(Type.CONCAT)
+            z.right = stack.pop()
+            z.left = stack.pop()
         else:
-            if c == "+":
-                z = ExpressionTree(Type.UNION)
-                z.right = stack.pop()
-                z.left = stack.pop()
-            elif c == ".":
-                z = ExpressionTree(Type.CONCAT)
-                z.right = stack.pop()
-                z.left = stack.pop()
-            elif c == "*":
-                z = ExpressionTree(Type.KLEENE)
-                z.left = stack.pop()
-            stack.append(z)
+            z = ExpressionTree(Type.KLEENE)
+            z.left = stack.pop()
+        stack.append(z)
 
+    if len(stack) != 1:
+        raise RegexSyntaxError('regex tidak valid')
     return stack[0]
 
 
@@ -57,152 +85,446 @@ def postfix(regexp):
     # Menambahkan titik "." antara simbol-simbol berturut-turut
     temp = []
     for i in range(len(regexp)):
+        if not (isSymbol(regexp[i]) or regexp[i] in REGEX_OPERATORS):
+            raise RegexSyntaxError(f'karakter tidak didukung pada regex: {regexp[i]!r}')
         if i != 0\
-            and (regexp[i-1].isalpha() or regexp[i-1] == ")" or regexp[i-1] == "*")\
-            and (regexp[i].isalpha() or regexp[i] == "("):
+            and (isSymbol(regexp[i-1]) or regexp[i-1] == ")" or regexp[i-1] == "*")\
+            and (isSymbol(regexp[i]) or regexp[i] == "("):
             temp.append(".")
         temp.append(regexp[i])
     regexp = temp
     
     stack = []
-    output = ""
+    output = []
 
     for c in regexp:
-        if c.isalpha() or c.isdigit():
-            output = output + c
+        if isSymbol(c):
+            output.append(c)
             continue
 
         if c == ")":
             while len(stack) != 0 and stack[-1] != "(":
-                output = output + stack.pop()
+                output.append(stack.pop())
+            if len(stack) == 0:
+                raise RegexSyntaxError('kurung tutup pada regex tanpa pasangan')
             stack.pop()
         elif c == "(":
             stack.append(c)
         elif c == "*":
-            output = output + c
+            output.append(c)
         elif len(stack) == 0 or stack[-1] == "(" or higherPrecedence(c, stack[-1]):
             stack.append(c)
         else:
             while len(stack) != 0 and stack[-1] != "(" and not higherPrecedence(c, stack[-1]):
-                output = output + stack.pop()
+                output.append(stack.pop())
             stack.append(c)
 
     while len(stack) != 0:
-        output = output + stack.pop()
+        if stack[-1] == "(":
+            raise RegexSyntaxError('kurung buka pada regex tanpa pasangan')
+        output.append(stack.pop())
 
-    return output
+    return "".join(output)
 
-# Kelas untuk merepresentasikan keadaan dalam otomata terbatas
-class FiniteAutomataState:
-    def __init__(self):
-        self.next_state = {}
+# Otomata terbatas hasil konstruksi Thompson, disimpan sebagai array paralel (arena).
+# State i punya satu transisi simbol (labels[i] -> symbol_out[i]) atau paling banyak
+# dua transisi epsilon (epsilon_out1[i], epsilon_out2[i]); -1 berarti tidak ada.
+class FiniteAutomata:
+    __slots__ = ('labels', 'symbol_out', 'epsilon_out1', 'epsilon_out2', 'start', 'end')
 
-# Fungsi untuk mengevaluasi pohon ekspresi dan menghasilkan otomata terbatas yang setara
+    def __init__(self):
+        self.labels = []
+        self.symbol_out = array('i')
+        self.epsilon_out1 = array('i')
+        self.epsilon_out2 = array('i')
+        self.start = -1
+        self.end = -1
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add_state(self):
+        self.labels.append(None)
+        self.symbol_out.append(-1)
+        self.epsilon_out1.append(-1)
+        self.epsilon_out2.append(-1)
+        return len(self.labels) - 1
+
+    def set_epsilon(self, state, first, second=-1):
+        self.epsilon_out1[state] = first
+        self.epsilon_out2[state] = second
+
+    # Transisi keluar dari state, urutannya sama dengan next_state pada versi berbasis objek
+    def transitions(self, state):
+        if self.labels[state] is not None:
+            return [(self.labels[state], self.symbol_out[state])]
+        edges = []
+        if self.epsilon_out1[state] != -1:
+            edges.append(('e', self.epsilon_out1[state]))
+        if self.epsilon_out2[state] != -1:
+            edges.append(('e', self.epsilon_out2[state]))
+        return edges
+
+# Fungsi untuk mengevaluasi pohon ekspresi dan menghasilkan otomata terbatas yang setara.
+# Pohon ditelusuri secara iteratif (post-order), sehingga ekspresi yang sangat dalam
+# tidak melewati batas rekursi.
 def evalRegex(et):
-    if et._type == Type.SYMBOL:
-        return evalRegexSymbol(et)
-    elif et._type == Type.CONCAT:
-        return evalRegexConcat(et)
-    elif et._type == Type.UNION:
-        return evalRegexUnion(et)
-    elif et._type == Type.KLEENE:
-        return evalRegexKleene(et)
+    fa = FiniteAutomata()
+    fragments = []
+    stack = [(et, False)]
+
+    while stack:
+        node, visited = stack.pop()
+        if node._type == Type.SYMBOL:
+            fragments.append(evalRegexSymbol(fa, node))
+            continue
+
+        if not visited:
+            stack.append((node, True))
+            if node.right is not None:
+                stack.append((node.right, False))
+            stack.append((node.left, False))
+            continue
+
+        if node._type == Type.CONCAT:
+            right = fragments.pop()
+            fragments.append(evalRegexConcat(fa, fragments.pop(), right))
+        elif node._type == Type.UNION:
+            right = fragments.pop()
+            fragments.append(evalRegexUnion(fa, fragments.pop(), right))
+        elif node._type == Type.KLEENE:
+            fragments.append(evalRegexKleene(fa, fragments.pop()))
+
+    fa.start, fa.end = fragments.pop()
+    return fa
 
 # Fungsi untuk mengevaluasi node ekspresi tipe SYMBOL
-def evalRegexSymbol(et):
-    start_state = FiniteAutomataState()
-    end_state   = FiniteAutomataState()
-    
-    start_state.next_state[et.value] = [end_state]
+def evalRegexSymbol(fa, et):
+    start_state = fa.add_state()
+    end_state   = fa.add_state()
+
+    fa.labels[start_state] = et.value
+    fa.symbol_out[start_state] = end_state
     return start_state, end_state
 
 # Fungsi untuk mengevaluasi node ekspresi tipe CONCAT
-def evalRegexConcat(et):
-    left_nfa  = evalRegex(et.left)
-    right_nfa = evalRegex(et.right)
-
-    left_nfa[1].next_state['e'] = [right_nfa[0]]
+def evalRegexConcat(fa, left_nfa, right_nfa):
+    fa.set_epsilon(left_nfa[1], right_nfa[0])
     return left_nfa[0], right_nfa[1]
 
 # Fungsi untuk mengevaluasi node ekspresi tipe UNION
-def evalRegexUnion(et):
-    start_state = FiniteAutomataState()
-    end_state   = FiniteAutomataState()
+def evalRegexUnion(fa, up_nfa, down_nfa):
+    start_state = fa.add_state()
+    end_state   = fa.add_state()
 
-    up_nfa   = evalRegex(et.left)
-    down_nfa = evalRegex(et.right)
-
-    start_state.next_state['e'] = [up_nfa[0], down_nfa[0]]
-    up_nfa[1].next_state['e'] = [end_state]
-    down_nfa[1].next_state['e'] = [end_state]
+    fa.set_epsilon(start_state, up_nfa[0], down_nfa[0])
+    fa.set_epsilon(up_nfa[1], end_state)
+    fa.set_epsilon(down_nfa[1], end_state)
 
     return start_state, end_state
 
 # Fungsi untuk mengevaluasi node ekspresi tipe KLEENE
-def evalRegexKleene(et):
-    start_state = FiniteAutomataState()
-    end_state   = FiniteAutomataState()
-
-    sub_nfa = evalRegex(et.left)
+def evalRegexKleene(fa, sub_nfa):
+    start_state = fa.add_state()
+    end_state   = fa.add_state()
 
-    start_state.next_state['e'] = [sub_nfa[0], end_state]
-    sub_nfa[1].next_state['e'] = [sub_nfa[0], end_state]
+    fa.set_epsilon(start_state, sub_nfa[0], end_state)
+    fa.set_epsilon(sub_nfa[1], sub_nfa[0], end_state)
 
     return start_state, end_state
 
 
-def visualizeTransitionGraph(finite_automata):
-    dot = graphviz.Digraph(comment='Finite Automata Transition Diagram')
-
-    symbol_table = {}
+# Menjelajahi transisi dari start state dengan DFS, menghasilkan nama state (q0, q1, ...
+# sesuai urutan DFS, -1 untuk state yang tidak terjangkau) dan daftar transisi
+# (state, next_state, symbol) dalam urutan kunjungan.
+def exploreTransitions(finite_automata):
+    symbol_table = array('i', [-1]) * len(finite_automata)
     state_count = 0
-    final_state = None
+    transitions_found = []
 
     def addState(state):
         nonlocal state_count
-        if state not in symbol_table:
-            symbol_table[state] = "q" + str(state_count)
+        if symbol_table[state] == -1:
+            symbol_table[state] = state_count
             state_count += 1
 
-    def addTransition(state, next_state, symbol):
-        dot.node(symbol_table[state], symbol_table[state])
-        dot.node(symbol_table[next_state], symbol_table[next_state])
-        dot.edge(symbol_table[state], symbol_table[next_state], label=symbol)
+    # DFS iteratif dengan urutan kunjungan yang sama seperti versi rekursif:
+    # setiap frame menyimpan state dan indeks transisi berikutnya yang akan dijelajahi
+    explored_states = bytearray(len(finite_automata))
+    start_state = finite_automata.start
+    addState(start_state)
+    explored_states[start_state] = 1
+    stack = [(start_state, 0)]
 
-    def exploreState(state):
-        if state in explored_states:
-            return
-        explored_states.add(state)
+    while stack:
+        state, index = stack.pop()
+        transitions = finite_automata.transitions(state)
+        if index == len(transitions):
+            continue
+        stack.append((state, index + 1))
 
-        for symbol, next_states in state.next_state.items():
-            for next_state in next_states:
-                addState(next_state)
-                addTransition(state, next_state, symbol)
-                exploreState(next_state)
+        symbol, next_state = transitions[index]
+        addState(next_state)
+        transitions_found.append((state, next_state, symbol))
+        if not explored_states[next_state]:
+            explored_states[next_state] = 1
+            stack.append((next_state, 0))
 
-    start_state, end_state = finite_automata
-    explored_states = set()
-    addState(start_state)
-    exploreState(start_state)
+    return symbol_table, transitions_found
+
+
+def visualizeTransitionGraph(finite_automata):
+    dot = graphviz.Digraph(comment='Finite Automata Transition Diagram')
+    symbol_table, transitions = exploreTransitions(finite_automata)
 
-    for state, symbol in symbol_table.items():
-        if state == end_state:
-            final_state = symbol
+    for state, next_state, symbol in transitions:
+        state_name = "q" + str(symbol_table[state])
+        next_state_name = "q" + str(symbol_table[next_state])
+        dot.node(state_name, state_name)
+        dot.node(next_state_name, next_state_name)
+        dot.edge(state_name, next_state_name, label=symbol)
 
+    final_state = "q" + str(symbol_table[finite_automata.end])
     dot.node(final_state, shape='doublecircle')
 
     dot.node('', shape='none')
-    dot.edge('', symbol_table[start_state], label="start")
+    dot.edge('', "q" + str(symbol_table[finite_automata.start]), label="start")
 
     return dot
 
 
-def nomor_2_run(input_regex):
-    pr = postfix(input_regex)
-    et = constructTree(pr)
-    fa = evalRegex(et)
-    transition_diagram = visualizeTransitionGraph(fa)
-    svg_result = transition_diagram.pipe(format='svg').decode('utf-8')
-
-    return svg_result
-
+# Graph json dengan penamaan state yang sama seperti diagram svg
+def transitionGraph(finite_automata):
+    symbol_table, transitions = exploreTransitions(finite_automata)
+    names = ["q" + str(i) for i in range(max(symbol_table) + 1)]
+    return {
+        'states': names,
+        'initial': "q" + str(symbol_table[finite_automata.start]),
+        'accepting': ["q" + str(symbol_table[finite_automata.end])],
+        'edges': [["q" + str(symbol_table[state]), "q" + str(symbol_table[next_state]),
+                   "ε" if finite_automata.labels[state] is None else symbol]
+                  for state, next_state, symbol in transitions],
+    }
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# Membangun DFA langsung dari pohon ekspresi dengan metode followpos (position automaton),
+# tanpa melalui epsilon-NFA. Setiap daun SYMBOL adalah satu posisi, himpunan posisi disimpan
+# sebagai bitmask. Posisi penanda akhir (#) ditambahkan setelah posisi terakhir.
+def regexToDFA(et):
+    # urutan post-order secara iteratif
+    order = []
+    stack = [et]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if node.left is not None:
+            stack.append(node.left)
+        if node.right is not None:
+            stack.append(node.right)
+    order.reverse()
+
+    # daun diberi nomor posisi dari kiri ke kanan
+    leaves = [node for node in reversed(order) if node._type == Type.SYMBOL]
+    leaves.reverse()
+    position = {node: i for i, node in enumerate(leaves)}
+    end_position = len(leaves)
+    followpos = [0] * (end_position + 1)
+
+    nullable, firstpos, lastpos = {}, {}, {}
+    for node in order:
+        if node._type == Type.SYMBOL:
+            nullable[node] = False
+            firstpos[node] = lastpos[node] = 1 << position[node]
+        elif node._type == Type.CONCAT:
+            left, right = node.left, node.right
+            nullable[node] = nullable[left] and nullable[right]
+            firstpos[node] = firstpos[left] | firstpos[right] if nullable[left] else firstpos[left]
+            lastpos[node] = lastpos[left] | lastpos[right] if nullable[right] else lastpos[right]
+            for p in _bits(lastpos[left]):
+                followpos[p] |= firstpos[right]
+        elif node._type == Type.UNION:
+            left, right = node.left, node.right
+            nullable[node] = nullable[left] or nullable[right]
+            firstpos[node] = firstpos[left] | firstpos[right]
+            lastpos[node] = lastpos[left] | lastpos[right]
+        elif node._type == Type.KLEENE:
+            nullable[node] = True
+            firstpos[node] = firstpos[node.left]
+            lastpos[node] = lastpos[node.left]
+            for p in _bits(lastpos[node]):
+                followpos[p] |= firstpos[node]
+
+    end_bit = 1 << end_position
+    for p in _bits(lastpos[et]):
+        followpos[p] |= end_bit
+    start = firstpos[et] | (end_bit if nullable[et] else 0)
+
+    symbol_positions = {}
+    for i, node in enumerate(leaves):
+        symbol_positions[node.value] = symbol_positions.get(node.value, 0) | (1 << i)
+    symbols = sorted(symbol_positions)
+
+    # subset construction atas himpunan posisi, state diberi nama q0, q1, ... sesuai urutan BFS
+    state_ids = {start: 0}
+    transitions = {'q0': {}}
+    transition_count = 0
+    final_states = set()
+    worklist = deque([start])
+    while worklist:
+        mask = worklist.popleft()
+        name = 'q' + str(state_ids[mask])
+        if mask & end_bit:
+            final_states.add(name)
+        for symbol in symbols:
+            next_mask = 0
+            for p in _bits(mask & symbol_positions[symbol]):
+                next_mask |= followpos[p]
+            if not next_mask:
+                continue
+            if next_mask not in state_ids:
+                state_ids[next_mask] = len(state_ids)
+                transitions['q' + str(state_ids[next_mask])] = {}
+                worklist.append(next_mask)
+            transitions[name][symbol] = 'q' + str(state_ids[next_mask])
+            transition_count += 1
+
+    return DFA(states=set(transitions),
+               input_symbols=set(symbols),
+               transitions=transitions,
+               initial_state='q0',
+               final_states=final_states,
+               transition_count=transition_count)
+
+
+# Mengubah arena Thompson menjadi nomor_5.ENFA (state q<i>, epsilon sebagai '')
+def toENFA(fa):
+    transitions = {}
+    for state in range(len(fa)):
+        for symbol, next_state in fa.transitions(state):
+            symbol = '' if fa.labels[state] is None else symbol
+            transitions.setdefault('q' + str(state), {}).setdefault(symbol, set()).add('q' + str(next_state))
+    return ENFA(states={'q' + str(state) for state in range(len(fa))},
+                input_symbols={label for label in fa.labels if label is not None},
+                transitions=transitions,
+                initial_state='q' + str(fa.start),
+                final_states={'q' + str(fa.end)})
+
+
+# Pola yang lebih panjang dari ini ditolak sebelum dikompilasi: closure dan tabel step
+# CompiledNFA berupa bitset yang ukurannya kuadratik terhadap panjang pola
+MAX_REGEX_LENGTH = int(os.environ.get('MAX_REGEX_LENGTH', '2000'))
+
+
+# Perkiraan memori CompiledNFA di balik lazy DFA hasil compile_regex (bitset closure dan step)
+def _compiled_size(matcher):
+    compiled = matcher.compiled
+    masks = list(compiled.closures)
+    for row in compiled.step_table:
+        masks.extend(row)
+    return sum(sys.getsizeof(mask) for mask in masks)
+
+
+# LRU hasil compile_regex yang dibatasi jumlah entry dan perkiraan total byte
+class RegexCache:
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, pattern):
+        with self._lock:
+            entry = self._entries.get(pattern)
+            if entry is None:
+                return None
+            self._entries.move_to_end(pattern)
+            return entry[0]
+
+    def put(self, pattern, matcher):
+        size = _compiled_size(matcher)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(pattern, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[pattern] = (matcher, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+regex_cache = RegexCache()
+
+
+# Pola regex (sintaks nomor_2: + untuk union) dikompilasi menjadi lazy DFA, sehingga
+# pencocokan berjalan linear terhadap panjang string. Hasil kompilasi disimpan per pola di regex_cache.
+def compile_regex(pattern):
+    # karakter tidak didukung dan regex yang tidak valid menghasilkan RegexSyntaxError dari postfix/constructTree
+    if len(pattern) > MAX_REGEX_LENGTH:
+        raise RegexSyntaxError(f'regex terlalu panjang ({len(pattern)} karakter, maksimal {MAX_REGEX_LENGTH})')
+    matcher = regex_cache.get(pattern)
+    if matcher is not None:
+        return matcher
+    # pola kosong hanya menerima string kosong
+    if pattern == '':
+        matcher = ENFA(states={'q0'}, input_symbols=set(), transitions={},
+                       initial_state='q0', final_states={'q0'}).lazy_dfa()
+    else:
+        with span('compile_regex', input_length=len(pattern)):
+            matcher = toENFA(evalRegex(constructTree(postfix(pattern)))).lazy_dfa()
+    regex_cache.put(pattern, matcher)
+    return matcher
+
+
+# Otomata hasil regex: DFA untuk engine 'dfa', arena Thompson untuk engine lain
+def regex_automata(input_regex, engine='thompson', minimize=False):
+    with span('parse_regex', input_length=len(input_regex)):
+        pr = postfix(input_regex)
+        et = constructTree(pr)
+
+    # engine 'dfa': DFA langsung dari pohon ekspresi, opsional diminimisasi dengan nomor_3
+    if engine == 'dfa':
+        with span('regex_to_dfa', input_length=len(input_regex)) as stage:
+            dfa = regexToDFA(et)
+            stage.set(automata=dfa)
+        if minimize:
+            with span('minimize', automata=dfa):
+                dfa = hopcroft_minimize(dfa)
+        return dfa
+
+    with span('thompson', input_length=len(input_regex)):
+        return evalRegex(et)
+
+
+def nomor_2_jobs(input_regex, engine='thompson', minimize=False):
+    automata = regex_automata(input_regex, engine, minimize)
+    if engine == 'dfa':
+        return make_svg_jobs([automata])
+    transition_diagram = visualizeTransitionGraph(automata)
+    # svg Thompson dikembalikan apa adanya dari dot, tanpa cache
+    return [RenderJob(None, lambda: transition_diagram, clean=False)]
+
+
+def nomor_2_run(input_regex, engine='thompson', minimize=False, format='svg'):
+    # format 'json': graph langsung dari DFA / arena Thompson, tanpa graphviz
+    if format == 'json':
+        automata = regex_automata(input_regex, engine, minimize)
+        if engine == 'dfa':
+            return make_graph(automata)
+        return transitionGraph(automata)
+    return render_jobs(nomor_2_jobs(input_regex, engine, minimize))[0]
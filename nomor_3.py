@@ -1,17 +1,36 @@
+from collections import deque
 from nomor_5 import DFA, make_svg
+from metrics import span
 
 def remove_unreachable_states(automaton, start, visited=None):
     if visited is None:
         visited = set()
     visited.add(start)
-    
-    for neighbor in automaton.transitions[start]:
-        if automaton.transitions[start][neighbor] not in visited:
-            remove_unreachable_states(automaton, automaton.transitions[start][neighbor], visited)
-    
+
+    # DFS iteratif, supaya DFA dengan ribuan state tidak melewati batas rekursi
+    stack = [start]
+    while stack:
+        state = stack.pop()
+        for next_state in automaton.transitions.get(state, {}).values():
+            if next_state not in visited:
+                visited.add(next_state)
+                stack.append(next_state)
+
     return list(sorted(visited))
 
-def minimize_dfa(dfa):
+# Tabel segitiga bawah: satu baris per state (urut),
+# berisi nilai ekuivalen terhadap state-state sebelumnya sampai dirinya sendiri
+def _table_rows(states, equivalence_classes):
+    rows = []
+    for i, state1 in enumerate(states):
+        rows.append({'state': state1, 'equivalent': [equivalence_classes[state1][state2] for state2 in states[:i + 1]]})
+    return rows
+
+
+# Table filling. Bila explanation (dict) diberikan, langkah-langkahnya diisikan ke dalamnya:
+# tabel awal, pasangan yang ditandai beserta simbol pembedanya (sekali per pasangan, sesuai
+# urutan ditandai), tabel akhir dan grup ekuivalen.
+def minimize_dfa(dfa, explanation=None):
     def get_next_state(current_state, symbol, transitions):
         return transitions.get(current_state, {}).get(symbol)
 
@@ -29,15 +48,12 @@ def minimize_dfa(dfa):
         for state2 in reachable_states:
             equivalence_classes[state1][state2] = (state1 in dfa.final_states) == (state2 in dfa.final_states)
     
-    print("table filing accepting states ≠ non accepting states : ")
-    for state1 in sorted(reachable_states):
-        print(state1, end=" ")
-        for state2 in sorted(reachable_states):
-            print(str(equivalence_classes[state1][state2]), end=" ")
-            if (state1 == state2): break
-        print("\n")
-    for state in sorted(reachable_states): print(" st " + state, end=" ")
-    print("")
+    sorted_states = sorted(reachable_states)
+    marked = []
+    if explanation is not None:
+        explanation['states'] = sorted_states
+        explanation['initial_table'] = _table_rows(sorted_states, equivalence_classes)
+        explanation['marked'] = marked
 
     # cek jika terdapat dua final states
     # if (len(dfa.final_states) > 1):
@@ -60,6 +76,8 @@ def minimize_dfa(dfa):
                     # next tidak equivalent = salah satu next state adalah final state
                     # maka kedua state tidak equivalent
                     if not are_states_equivalent(next_state1, next_state2):
+                        if equivalence_classes[state1][state2]:
+                            marked.append([state1, state2, symbol])
                         equivalence_classes[state1][state2] = False
                         changed = True
                         break
@@ -74,6 +92,8 @@ def minimize_dfa(dfa):
                                 # next tidak equivalent = salah satu next state adalah final state
                                 # maka kedua state tidak equivalent
                                 if not are_states_equivalent(next_state1_2, next_state2_2):
+                                    if equivalence_classes[state1][state2]:
+                                        marked.append([state1, state2, symbol1 + symbol2])
                                     equivalence_classes[state1][state2] = False
                                     changed = True
                                     break
@@ -83,15 +103,8 @@ def minimize_dfa(dfa):
         if not changed:
             break
 
-    print("table filling result : ")
-    for state1 in sorted(reachable_states):
-        print(state1, end=" ")
-        for state2 in sorted(reachable_states):
-            print(str(equivalence_classes[state1][state2]), end=" ")
-            if (state1 == state2): break
-        print("\n")
-    for state in sorted(reachable_states): print(" st " + state, end=" ")
-    print("")
+    if explanation is not None:
+        explanation['final_table'] = _table_rows(sorted_states, equivalence_classes)
 
     # 3. equivalence group
     equivalence_group = {}
@@ -101,8 +114,6 @@ def minimize_dfa(dfa):
         for state2 in reachable_states:
             if state1 != state2 and equivalence_classes[state1][state2]:
                 equivalence_group[state2] = equivalence_group[state1]
-    print ("equivalence group: ", end="")
-    print(equivalence_group)
 
     new_states = set()
     new_final_states = set()
@@ -112,8 +123,9 @@ def minimize_dfa(dfa):
         new_states.add(equivalence_group[state])
         if state in dfa.final_states:
             new_final_states.add(equivalence_group[state])
-    print("new_states", end="")
-    print(new_states)
+    if explanation is not None:
+        explanation['equivalence_group'] = equivalence_group
+        explanation['new_states'] = sorted(new_states)
 
     for state in reachable_states:
         for symbol in dfa.input_symbols:
@@ -133,7 +145,103 @@ def minimize_dfa(dfa):
 
     return new_dfa
 
-def nomor_3_run(input_dfa):
+def hopcroft_minimize(dfa):
+    # 1. remove unreachable states
+    reachable_states = remove_unreachable_states(dfa, dfa.initial_state)
+    symbols = sorted(dfa.input_symbols)
+    index = {state: i for i, state in enumerate(reachable_states)}
+
+    # state mati implisit (index n) untuk transisi yang tidak didefinisikan
+    n = len(reachable_states)
+    dead = n
+    inverse = [[[] for _ in range(n + 1)] for _ in symbols]
+    for state, i in index.items():
+        transitions = dfa.transitions.get(state, {})
+        for s, symbol in enumerate(symbols):
+            next_state = transitions.get(symbol)
+            inverse[s][dead if next_state is None else index[next_state]].append(i)
+    for s in range(len(symbols)):
+        inverse[s][dead].append(dead)
+
+    # 2. partisi awal: accepting states dan non accepting states (termasuk state mati)
+    accepting = {index[state] for state in reachable_states if state in dfa.final_states}
+    non_accepting = set(range(n + 1)) - accepting
+    blocks = [set(block) for block in (accepting, non_accepting) if block]
+    block_of = [0] * (n + 1)
+    for b, block in enumerate(blocks):
+        for i in block:
+            block_of[i] = b
+
+    # 3. partition refinement, selalu memakai blok yang lebih kecil sebagai splitter
+    worklist = deque()
+    in_worklist = set()
+    if len(blocks) == 2:
+        smaller = 0 if len(blocks[0]) <= len(blocks[1]) else 1
+        for s in range(len(symbols)):
+            worklist.append((smaller, s))
+            in_worklist.add((smaller, s))
+
+    while worklist:
+        splitter, s = worklist.popleft()
+        in_worklist.discard((splitter, s))
+
+        touched = {}
+        for target in list(blocks[splitter]):
+            for source in inverse[s][target]:
+                touched.setdefault(block_of[source], set()).add(source)
+
+        for b, members in touched.items():
+            if len(members) == len(blocks[b]):
+                continue
+            new_b = len(blocks)
+            blocks[b] -= members
+            blocks.append(members)
+            for i in members:
+                block_of[i] = new_b
+            for c in range(len(symbols)):
+                if (b, c) in in_worklist:
+                    added = new_b
+                else:
+                    added = b if len(blocks[b]) <= len(members) else new_b
+                worklist.append((added, c))
+                in_worklist.add((added, c))
+
+    # 4. setiap blok diberi nama state terkecil di dalamnya, blok yang hanya berisi state mati dibuang
+    names = {}
+    for state in reachable_states:
+        names.setdefault(block_of[index[state]], state)
+
+    new_states = set(names.values())
+    new_final_states = {names[block_of[i]] for i in accepting}
+    new_transitions = {}
+    transition_count = 0
+    for b, name in names.items():
+        new_transitions[name] = {}
+        for s, symbol in enumerate(symbols):
+            next_state = dfa.transitions.get(name, {}).get(symbol)
+            target = block_of[dead if next_state is None else index[next_state]]
+            if target in names:
+                new_transitions[name][symbol] = names[target]
+                transition_count += 1
+
+    new_dfa = DFA(
+        states=new_states,
+        input_symbols=dfa.input_symbols,
+        transitions=new_transitions,
+        initial_state=names[block_of[index[dfa.initial_state]]],
+        final_states=new_final_states,
+        transition_count=transition_count
+    )
+
+    return new_dfa
+
+# explanation (dict) hanya dipakai mode explain, lihat minimize_dfa
+def nomor_3_run(input_dfa, explain=False, explanation=None):
     initial_dfa = input_dfa
-    minimized_dfa = minimize_dfa(initial_dfa)
-    return minimized_dfa
\ No newline at end of file
+    with span('minimize', automata=initial_dfa):
+        # mode explain memakai table filling yang mencatat tabel langkah demi langkah
+        if explain:
+            minimized_dfa = minimize_dfa(initial_dfa, explanation)
+        else:
+            minimized_dfa = hopcroft_minimize(initial_dfa)
+    return minimized_dfa
@@ -1,4 +1,6 @@
+from collections import deque
 from nomor_5 import create_automata
+from metrics import span
 
 def equivalent(dfa1, dfa2):
     def get_next_state(current_state, symbol, transitions):
@@ -62,12 +64,64 @@ def equivalent(dfa1, dfa2):
     return True
 
 
-def nomor_4_run(dfa1, dfa2):
-    dfa1_automata = create_automata(dfa1)
-    dfa2_automata = create_automata(dfa2)
-    print(dfa1_automata)
+def equivalent_with_witness(dfa1, dfa2):
+    # Hopcroft-Karp: BFS hanya pada pasangan state yang reachable, pasangan yang
+    # sudah pasti ekuivalen (lewat transitivitas) digabung dengan union-find.
+    # State ditandai (1, state) / (2, state) dan None menjadi state mati.
+    symbols = sorted(dfa1.input_symbols | dfa2.input_symbols)
+    automata = {1: dfa1, 2: dfa2}
+    parent = {}
 
-    if equivalent(dfa1_automata, dfa2_automata):
-        return True
-    else:
-        return False
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def is_final(node):
+        side, state = node
+        return state is not None and state in automata[side].final_states
+
+    def get_next_state(node, symbol):
+        side, state = node
+        if state is None:
+            return node
+        return side, automata[side].transitions.get(state, {}).get(symbol)
+
+    start = ((1, dfa1.initial_state), (2, dfa2.initial_state))
+    parent[find(start[0])] = find(start[1])
+    previous = {start: None}
+    queue = deque([start])
+
+    while queue:
+        pair = queue.popleft()
+        if is_final(pair[0]) != is_final(pair[1]):
+            # BFS menjamin string pembeda yang ditemukan adalah yang terpendek
+            witness = []
+            while previous[pair] is not None:
+                pair, symbol = previous[pair]
+                witness.append(symbol)
+            return False, ''.join(reversed(witness))
+
+        for symbol in symbols:
+            next_pair = (get_next_state(pair[0], symbol), get_next_state(pair[1], symbol))
+            root1, root2 = find(next_pair[0]), find(next_pair[1])
+            if root1 != root2:
+                parent[root1] = root2
+                previous[next_pair] = (pair, symbol)
+                queue.append(next_pair)
+
+    return True, None
+
+
+def nomor_4_run(dfa1, dfa2, engine="hopcroft_karp"):
+    # dfa boleh berupa definisi json atau otomata yang sudah dibuat (dari registry)
+    dfa1_automata = create_automata(dfa1) if isinstance(dfa1, dict) else dfa1
+    dfa2_automata = create_automata(dfa2) if isinstance(dfa2, dict) else dfa2
+
+    with span('equivalence', automata=dfa1_automata):
+        # engine "table" memakai table filling lama, tanpa string pembeda
+        if engine == "table":
+            return equivalent(dfa1_automata, dfa2_automata), None
+        return equivalent_with_witness(dfa1_automata, dfa2_automata)
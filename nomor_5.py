@@ -1,202 +1,567 @@
-from bs4 import BeautifulSoup
 from graphviz import Digraph
+from svg_postprocess import clean_svg
+from svg_cache import svg_cache, automata_key
+from svg_overlay import node_positions, overlay_path, step_label
+from render_service import render_service
+from metrics import span
+from array import array
 import copy
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Tokenizer simbol untuk alfabet multi-karakter (misal "ab" dan "abc"):
+# trie dibangun sekali dari input_symbols, input dipotong dengan longest match.
+# Setiap potongan dicari paling jauh sepanjang simbol terpanjang, jadi total O(n * panjang simbol).
+class SymbolTokenizer:
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.children = [{}]
+        self.terminal = [-1]
+        for symbol_id, symbol in enumerate(self.symbols):
+            node = 0
+            for char in symbol:
+                next_node = self.children[node].get(char)
+                if next_node is None:
+                    next_node = len(self.children)
+                    self.children[node][char] = next_node
+                    self.children.append({})
+                    self.terminal.append(-1)
+                node = next_node
+            self.terminal[node] = symbol_id
+
+    def tokenize(self, input_string, invalid=None):
+        # menghasilkan id simbol; bila ada bagian yang bukan simbol, `invalid` dikeluarkan lalu berhenti
+        children, terminal = self.children, self.terminal
+        index, length = 0, len(input_string)
+        while index < length:
+            node, position = 0, index
+            match, match_end = -1, index
+            while position < length:
+                node = children[node].get(input_string[position])
+                if node is None:
+                    break
+                position += 1
+                if terminal[node] >= 0:
+                    match, match_end = terminal[node], position
+            if match < 0:
+                yield invalid
+                return
+            yield match
+            index = match_end
+
+
+class _SymbolTranslation(dict):
+    # karakter yang bukan simbol diterjemahkan ke kolom invalid
+    def __init__(self, mapping, invalid):
+        super().__init__(mapping)
+        self.invalid = invalid
+
+    def __missing__(self, key):
+        return self.invalid
+
+
+# DFA dengan state dan simbol yang dipetakan ke id integer.
+# Transisi disimpan dalam satu tabel datar berisi offset baris tujuan:
+# table[state * width + simbol], dengan satu baris state mati dan satu kolom simbol invalid.
+class CompiledDFA:
+    def __init__(self, dfa):
+        names = set(dfa.states) | set(dfa.transitions) | {dfa.initial_state}
+        for transitions in dfa.transitions.values():
+            names.update(next_state for next_state in transitions.values() if next_state is not None)
+        self.state_names = sorted(names)
+        self.state_ids = {name: i for i, name in enumerate(self.state_names)}
+        self.symbols = sorted(symbol for symbol in dfa.input_symbols if symbol != '')
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        width = len(self.symbols) + 1
+        self.width = width
+        self.dead = len(self.state_names)
+        self.table = array('i', [self.dead * width]) * ((self.dead + 1) * width)
+        for state, transitions in dfa.transitions.items():
+            base = self.state_ids[state] * width
+            for symbol, next_state in transitions.items():
+                if symbol in self.symbol_ids and next_state is not None:
+                    self.table[base + self.symbol_ids[symbol]] = self.state_ids[next_state] * width
+
+        self.accepting = bytearray(self.dead + 1)
+        for state in dfa.final_states:
+            if state in self.state_ids:
+                self.accepting[self.state_ids[state]] = 1
+        self.initial = self.state_ids[dfa.initial_state]
+
+        self.tokenizer = SymbolTokenizer(self.symbols)
+        self._translation = None
+        if width <= 256 and all(len(symbol) == 1 for symbol in self.symbols):
+            self._translation = _SymbolTranslation(
+                {ord(symbol): chr(i) for symbol, i in self.symbol_ids.items()},
+                chr(width - 1))
+
+    def encode(self, input_string):
+        # string -> urutan id simbol
+        if self._translation is not None:
+            return input_string.translate(self._translation).encode('latin-1')
+        return list(self.tokenizer.tokenize(input_string, invalid=self.width - 1))
+
+    def run(self, input_string, trace=None):
+        table, width = self.table, self.width
+        dead = self.dead * width
+        state = self.initial * width
+        if trace is None:
+            for symbol_id in self.encode(input_string):
+                state = table[state + symbol_id]
+                if state == dead:
+                    return False
+        else:
+            for symbol_id in self.encode(input_string):
+                state = table[state + symbol_id]
+                if state == dead:
+                    return False
+                trace.append(state // width)
+        return self.accepting[state // width] == 1
+
+    def run_batch(self, strings, max_cells=1 << 22):
+        # tanpa numpy, setiap string dijalankan satu per satu
+        if np is None:
+            return [self.run(input_string) for input_string in strings]
+
+        width = self.width
+        rows = self.dead + 1
+        # tabel offset baris tujuan dengan kolom tambahan untuk padding yang tidak mengubah state
+        padded_width = width + 1
+        table = np.empty((rows, padded_width), dtype=np.int64)
+        table[:, :width] = np.frombuffer(self.table, dtype=np.int32).reshape(rows, width) // width * padded_width
+        table[:, width] = np.arange(rows, dtype=np.int64) * padded_width
+        table = table.ravel()
+        accepting = np.frombuffer(bytes(self.accepting), dtype=np.uint8).astype(bool)
+
+        if self._translation is not None:
+            encoded = None
+            lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+        else:
+            encoded = [self.encode(input_string) for input_string in strings]
+            lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        order = np.argsort(lengths, kind='stable')
+        result = np.zeros(len(strings), dtype=bool)
+
+        # string diurutkan berdasarkan panjang lalu diproses per potongan,
+        # sehingga ukuran matriks padding tetap dibatasi max_cells
+        start = 0
+        while start < len(order):
+            end = start + 1
+            while end < len(order) and (end - start + 1) * lengths[order[end]] <= max_cells:
+                end += 1
+            chunk = order[start:end]
+            longest = int(lengths[chunk[-1]])
+
+            # semua id simbol dalam potongan digabung, lalu disebar ke matriks yang disusun
+            # per langkah (langkah ke-i dari semua string bersebelahan di memori)
+            if encoded is None:
+                joined = ''.join([strings[i] for i in chunk])
+                flat = np.frombuffer(self.encode(joined), dtype=np.uint8)
+            else:
+                flat = np.fromiter((symbol_id for i in chunk for symbol_id in encoded[i]), dtype=np.int32)
+            matrix = np.full((longest, len(chunk)), width, dtype=np.uint8 if width < 256 else np.int32)
+            matrix.T[np.arange(longest)[None, :] < lengths[chunk][:, None]] = flat
+
+            states = np.full(len(chunk), self.initial * padded_width, dtype=np.int64)
+            for step in matrix:
+                states = table[states + step]
+            result[chunk] = accepting[states // padded_width]
+            start = end
+
+        return result.tolist()
+
+
+# NFA/ENFA dengan himpunan state aktif berupa bitset (int Python): bit ke-i = state ke-i.
+# Epsilon closure setiap state dihitung sekali lewat kondensasi SCC graf epsilon,
+# dan closure() = union closure(target) untuk setiap (state, simbol) disimpan di tabel step.
+class CompiledNFA:
+    def __init__(self, automata, epsilon=True):
+        names = set(automata.states) | set(automata.transitions) | {automata.initial_state}
+        for transitions in automata.transitions.values():
+            for next_states in transitions.values():
+                names.update(next_states)
+        self.state_names = sorted(names)
+        self.state_ids = {name: i for i, name in enumerate(self.state_names)}
+        self.symbols = sorted(symbol for symbol in automata.input_symbols if symbol != '')
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.tokenizer = SymbolTokenizer(self.symbols)
+
+        n = len(self.state_names)
+        epsilon_edges = [[] for _ in range(n)]
+        self.targets = [[0] * n for _ in self.symbols]
+        for state, transitions in automata.transitions.items():
+            i = self.state_ids[state]
+            for symbol, next_states in transitions.items():
+                if symbol == '' and epsilon:
+                    epsilon_edges[i].extend(self.state_ids[next_state] for next_state in next_states)
+                elif symbol in self.symbol_ids:
+                    row = self.targets[self.symbol_ids[symbol]]
+                    for next_state in next_states:
+                        row[i] |= 1 << self.state_ids[next_state]
+
+        self.closures = self._epsilon_closures(epsilon_edges)
+        self.step_table = [[self.closure_mask(mask) for mask in row] for row in self.targets]
+
+        self.initial_state = automata.initial_state
+        self.initial = self.closures[self.state_ids[automata.initial_state]]
+        self.accepting = 0
+        for state in automata.final_states:
+            if state in self.state_ids:
+                self.accepting |= 1 << self.state_ids[state]
+
+    @staticmethod
+    def _epsilon_closures(edges):
+        # Tarjan iteratif; SCC keluar dalam urutan topologis terbalik,
+        # sehingga closure semua SCC tujuan sudah tersedia ketika sebuah SCC selesai
+        n = len(edges)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        component = [-1] * n
+        component_closure = []
+        stack = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+            while work:
+                v, position = work[-1]
+                if position < len(edges[v]):
+                    work[-1] = (v, position + 1)
+                    w = edges[v][position]
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, 0))
+                    elif on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] != index[v]:
+                    continue
+
+                members = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = len(component_closure)
+                    members.append(w)
+                    if w == v:
+                        break
+                closure = 0
+                for w in members:
+                    closure |= 1 << w
+                    for next_state in edges[w]:
+                        if component[next_state] != component[v]:
+                            closure |= component_closure[component[next_state]]
+                component_closure.append(closure)
+
+        return [component_closure[component[i]] for i in range(n)]
+
+    @staticmethod
+    def bits(mask):
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    def names(self, mask):
+        return {self.state_names[i] for i in self.bits(mask)}
+
+    def closure_mask(self, mask):
+        result = 0
+        for i in self.bits(mask):
+            result |= self.closures[i]
+        return result
 
+    def closure_of(self, states):
+        return self.closure_mask(sum(1 << self.state_ids[state] for state in set(states) if state in self.state_ids))
 
-class DFA:
-    def __init__(self, states, input_symbols, transitions, initial_state, final_states):
-        self.states = states
-        self.input_symbols = input_symbols
-        self.transitions = transitions
-        self.initial_state = initial_state
-        self.final_states = final_states
-        self.path = [self.initial_state]
-
-    def accepts_input(self, input_string):
-        current_state = self.initial_state
+    def step(self, mask, symbol_id):
+        row = self.step_table[symbol_id]
+        result = 0
+        while mask:
+            low_bit = mask & -mask
+            result |= row[low_bit.bit_length() - 1]
+            mask ^= low_bit
+        return result
 
-        for symbol in input_string:
-            if symbol not in self.input_symbols:
+    def trace_path(self, masks, symbol_ids):
+        # satu jalur state dari awal sampai akhir, dicari mundur dari state akhir
+        # (diutamakan accepting state) ke predecessor pada setiap langkah
+        if len(masks) == 1:
+            return [self.initial_state]
+        last = masks[-1] & self.accepting or masks[-1]
+        current = (last & -last).bit_length() - 1
+        path = [current]
+        for t in range(len(symbol_ids), 0, -1):
+            row = self.step_table[symbol_ids[t - 1]]
+            for previous in self.bits(masks[t - 1]):
+                if row[previous] >> current & 1:
+                    current = previous
+                    break
+            path.append(current)
+        return [self.state_names[i] for i in reversed(path)]
+
+
+LAZY_DFA_MAX_STATES = 4096
+
+
+class _LazyStates:
+    # tabel DFA hasil subset construction: id 0 selalu himpunan kosong (state mati)
+    __slots__ = ('ids', 'masks', 'rows', 'accepting')
+
+    def __init__(self):
+        self.ids = {}
+        self.masks = []
+        self.rows = []
+        self.accepting = []
+
+
+# Subset construction on-the-fly di atas CompiledNFA: setiap himpunan state aktif yang baru
+# ditemui dijadikan state DFA, transisinya diingat ketika pertama kali dihitung.
+# Bila jumlah state melebihi max_states, seluruh cache dibuang dan dibangun ulang.
+class LazyDFA:
+    def __init__(self, compiled, max_states=LAZY_DFA_MAX_STATES):
+        self.compiled = compiled
+        self.max_states = max_states
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._states = self._new_states()
+
+    def _new_states(self):
+        states = _LazyStates()
+        self._intern(states, 0)
+        self._intern(states, self.compiled.initial)
+        return states
+
+    def _intern(self, states, mask):
+        state = states.ids.get(mask)
+        if state is None:
+            state = len(states.masks)
+            states.masks.append(mask)
+            states.rows.append([None] * len(self.compiled.symbols))
+            states.accepting.append(bool(mask & self.compiled.accepting))
+            states.ids[mask] = state
+        return state
+
+    def _next(self, states, state, symbol_id):
+        with self._lock:
+            mask = self.compiled.step(states.masks[state], symbol_id)
+            if mask not in states.ids and len(states.masks) >= self.max_states and states is self._states:
+                self.flushes += 1
+                current_mask = states.masks[state]
+                states = self._states = self._new_states()
+                state = self._intern(states, current_mask)
+            next_state = self._intern(states, mask)
+            states.rows[state][symbol_id] = next_state
+        return states, next_state
+
+    def run(self, symbol_ids, trace=None):
+        # trace (opsional) diisi bitset state aktif setiap langkah
+        states = self._states
+        current = states.ids[self.compiled.initial]
+        for symbol_id in symbol_ids:
+            if symbol_id is None:
                 return False
-            current_state = self.transitions[current_state].get(symbol)
-            if current_state is None:
+            next_state = states.rows[current][symbol_id]
+            if next_state is None:
+                states, next_state = self._next(states, current, symbol_id)
+            current = next_state
+            if current == 0:
                 return False
-            self.path.append(current_state)
-        return current_state in self.final_states
+            if trace is not None:
+                trace.append(states.masks[current])
+        return states.accepting[current]
 
-    def copy(self):
-        return copy.deepcopy(self)
+    def accepts(self, input_string):
+        return self.run(self.compiled.tokenizer.tokenize(input_string))
+
+    def accepts_with_path(self, input_string):
+        # path hanya dibentuk bila seluruh input terbaca, sama seperti sebelumnya
+        symbol_ids = list(self.compiled.tokenizer.tokenize(input_string))
+        masks = [self.compiled.initial]
+        result = self.run(symbol_ids, masks)
+        if len(masks) != len(symbol_ids) + 1:
+            return False, []
+        return result, self.compiled.trace_path(masks, symbol_ids)
+
+    def stats(self):
+        return {'states': len(self._states.masks), 'flushes': self.flushes}
 
 
-class NFA:
-    def __init__(self, states, input_symbols, transitions, initial_state, final_states):
+# Jejak satu kali eksekusi, terpisah dari objek otomata: urutan id state dalam array
+# (nama diambil dari state_names hasil compile) beserta hasil penerimaannya
+class Trace:
+    __slots__ = ('state_names', 'states', 'accepted')
+
+    def __init__(self, state_names, states, accepted):
+        self.state_names = state_names
+        self.states = states
+        self.accepted = accepted
+
+    def __len__(self):
+        return max(len(self.states) - 1, 0)
+
+    @property
+    def path(self):
+        return [self.state_names[state] for state in self.states]
+
+    # Langkah yang melewati transisi yang sama digabung: (asal, tujuan, jumlah, langkah
+    # pertama, langkah terakhir), berurutan sesuai kemunculan pertama
+    def steps(self):
+        steps = {}
+        states = self.states
+        for i in range(1, len(states)):
+            pair = (states[i - 1], states[i])
+            step = steps.get(pair)
+            if step is None:
+                steps[pair] = [1, i, i]
+            else:
+                step[0] += 1
+                step[2] = i
+        return [(self.state_names[source], self.state_names[target], count, first, last)
+                for (source, target), (count, first, last) in steps.items()]
+
+
+class DFA:
+    # transition_count: jumlah transisi bila sudah diketahui pembuatnya, supaya size() tidak
+    # perlu menelusuri transitions
+    def __init__(self, states, input_symbols, transitions, initial_state, final_states, transition_count=None):
         self.states = states
         self.input_symbols = input_symbols
         self.transitions = transitions
         self.initial_state = initial_state
         self.final_states = final_states
-        self.path_mentah = []
-        self.path = []
+        self._compiled = None
+        self._size = None if transition_count is None else (len(states), transition_count)
 
-    def accepts_input(self, input_string):
-        current_states = {self.initial_state}
-        self.path = []
-        index = 0
-        while index < len(input_string):
-            for length in range(1, len(input_string) - index + 1):
-                symbol = input_string[index:index + length]
-
-                if symbol in self.input_symbols:
-                    index += length
-                    next_states = {}
-                    for state in current_states:
-                        next_states[state] = self.transitions[state].get(symbol, set())
-                    current_states = set()
-                    for states_set in next_states.values():
-                        current_states.update(states_set)
-                    self.path_mentah.append(next_states)
-                    break
-                else:
-                    return False
+    # hasil compile dan ukuran di-cache; panggil invalidate() bila states/transitions diubah
+    def invalidate(self):
+        self._compiled = None
+        self._size = None
 
-            if not current_states:
-                return False
+    # (jumlah state, jumlah transisi) untuk metrics, dihitung sekali per otomata
+    def size(self):
+        if self._size is None:
+            self._size = (len(self.states), sum(len(row) for row in self.transitions.values()))
+        return self._size
 
-        print(self.path_mentah)
-        self.track_path()
-        return any(state in self.final_states for state in current_states)
-
-    def track_path(self):
-        def cek_accepting(cek_dict, finish_set):
-            selected_child = ""
-            for child_set in cek_dict.values():
-                for child in child_set:
-                    if child in finish_set:
-                        selected_child = child
-            if selected_child == "":
-                for children_set in cek_dict.values():
-                    children_list = list(children_set)
-                    if not children_list:
-                        continue
-                    selected_child = children_list[0]
-                    break
-            return selected_child
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = CompiledDFA(self)
+        return self._compiled
+
+    def accepts_input(self, input_string):
+        return self.compile().run(input_string)
 
-        def cari_key(d, nilai):
-            for k, v in d.items():
-                if nilai in v:
-                    return k
-            return None
+    def trace(self, input_string):
+        with span('accepts', automata=self, input_length=len(input_string)):
+            compiled = self.compile()
+            states = array('i', [compiled.initial])
+            accepted = compiled.run(input_string, states)
+        return Trace(compiled.state_names, states, accepted)
 
-        last_path = self.path_mentah[-1]
-        current = cek_accepting(last_path, self.final_states)
-        self.path.append(current)
-        for element in reversed(self.path_mentah):
-            current = cari_key(element, current)
-            self.path.append(current)
+    def copy(self):
+        return copy.deepcopy(self)
 
-        self.path = self.path[::-1]
-        print(self.path)
-        return self.path
 
+# Dasar NFA dan ENFA: bitset CompiledNFA dan cache subset construction (LazyDFA) di atasnya
+class _SubsetAutomata:
+    epsilon = False
 
-class ENFA:
-    def __init__(self, states, input_symbols, transitions, initial_state, final_states):
+    def __init__(self, states, input_symbols, transitions, initial_state, final_states, transition_count=None):
         self.states = states
         self.input_symbols = input_symbols
         self.transitions = transitions
         self.initial_state = initial_state
         self.final_states = final_states
-        self.path_mentah = []
-        self.path = []
+        self._compiled = None
+        self._lazy_dfa = None
+        self._size = None if transition_count is None else (len(states), transition_count)
+
+    # hasil compile, lazy DFA dan ukuran di-cache; panggil invalidate() bila states/transitions diubah
+    def invalidate(self):
+        self._compiled = None
+        self._lazy_dfa = None
+        self._size = None
+
+    def size(self):
+        if self._size is None:
+            self._size = (len(self.states),
+                          sum(len(next_states) for row in self.transitions.values() for next_states in row.values()))
+        return self._size
+
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = CompiledNFA(self, epsilon=self.epsilon)
+        return self._compiled
+
+    def lazy_dfa(self):
+        if self._lazy_dfa is None:
+            self._lazy_dfa = LazyDFA(self.compile())
+        return self._lazy_dfa
 
-    def epsilon_closure(self, states):
-        closure = set(states)
-        stack = list(states)
-        while stack:
-            state = stack.pop()
-            epsilon_transitions = self.transitions[state].get('', set())
-            for epsilon_state in epsilon_transitions:
-                if epsilon_state not in closure:
-                    closure.add(epsilon_state)
-                    stack.append(epsilon_state)
-        return closure
+    def accepts_input(self, input_string):
+        return self.lazy_dfa().accepts(input_string)
 
-    def transition_with_epsilon(self, states, symbol):
-        result = set()
-        for state in states:
-            epsilon_closure_states = self.epsilon_closure({state})
-            for epsilon_state in epsilon_closure_states:
-                next_states = self.transitions[epsilon_state].get(symbol, set())
-                result.update(next_states)
-        return result
+    def trace(self, input_string):
+        with span('accepts', automata=self, input_length=len(input_string)):
+            compiled = self.compile()
+            accepted, path = self.lazy_dfa().accepts_with_path(input_string)
+        return Trace(compiled.state_names, array('i', (compiled.state_ids[state] for state in path)), accepted)
 
-    def accepts_input(self, input_string):
-        current_states = self.epsilon_closure({self.initial_state})
-
-        index = 0
-        while index < len(input_string):
-            for length in range(1, len(input_string) - index + 1):
-                symbol = input_string[index:index + length]
-
-                if symbol in self.input_symbols:
-                    index += length
-
-                    next_states = {}
-                    for state in current_states:
-                        transitions = self.transitions[state].get(symbol, set())
-                        transitions_with_epsilon = set()
-                        for transition_state in transitions:
-                            transitions_with_epsilon.update(self.epsilon_closure({transition_state}))
-                        next_states[state] = transitions_with_epsilon
-                    current_states = set().union(*next_states.values())
-
-                    self.path_mentah.append(next_states)
-                    break
-                else:
-                    return False
 
-            if not current_states:
-                return False
-            
-        self.track_path()
-        return any(state in self.final_states for state in current_states)
-
-    def track_path(self):
-        def cek_accepting(cek_dict, finish_set):
-            selected_child = ""
-            for child_set in cek_dict.values():
-                for child in child_set:
-                    if child in finish_set:
-                        selected_child = child
-            if selected_child == "":
-                for children_set in cek_dict.values():
-                    children_list = list(children_set)
-                    if not children_list:
-                        continue
-                    selected_child = children_list[0]
-                    break
-            return selected_child
+class NFA(_SubsetAutomata):
+    epsilon = False
 
-        def cari_key(d, nilai):
-            for k, v in d.items():
-                if nilai in v:
-                    return k
-            return None
 
-        last_path = self.path_mentah[-1]
-        current = cek_accepting(last_path, self.final_states)
-        self.path.append(current)
-        for element in reversed(self.path_mentah):
-            current = cari_key(element, current)
-            self.path.append(current)
+class ENFA(_SubsetAutomata):
+    epsilon = True
 
-        self.path = self.path[::-1]
-        print(self.path)
-        return self.path
+    def epsilon_closure(self, states):
+        compiled = self.compile()
+        return compiled.names(compiled.closure_of(states))
+
+    def transition_with_epsilon(self, states, symbol):
+        compiled = self.compile()
+        symbol_id = compiled.symbol_ids.get(symbol)
+        if symbol_id is None:
+            return set()
+        # sama seperti sebelumnya: closure dari states, lalu transisi simbol tanpa closure akhir
+        result = 0
+        for state in compiled.bits(compiled.closure_of(states)):
+            result |= compiled.targets[symbol_id][state]
+        return compiled.names(result)
 
 
 def create_automata(data):
+    with span('create_automata') as stage:
+        automata = _create_automata(data)
+        stage.set(automata=automata)
+    return automata
+
+
+def _create_automata(data):
     type_automata = data['type']
 
     states = set(data['states'])
@@ -207,21 +572,25 @@ def create_automata(data):
 
     if type_automata == 'DFA':
         dfa_transitions = {}
+        transition_count = 0
         for from_state, transition in transitions.items():
             dfa_transitions[from_state] = {}
             for symbol, next_states in transition.items():
                 if next_states:
                     next_state = next_states[0]
                     dfa_transitions[from_state][symbol] = next_state
+                    transition_count += 1
         automata = DFA(states=states,
                        input_symbols=input_symbols,
                        transitions=dfa_transitions,
                        initial_state=initial_state,
-                       final_states=final_states)
+                       final_states=final_states,
+                       transition_count=transition_count)
         return automata
 
     elif type_automata == 'NFA':
         nfa_transitions = {}
+        transition_count = 0
         for from_state, transition in transitions.items():
             nfa_transitions[from_state] = {}
             for symbol, next_states in transition.items():
@@ -229,16 +598,19 @@ def create_automata(data):
                     next_states = {next_states}
                 if next_states:
                     nfa_transitions[from_state][symbol] = set(next_states)
+                    transition_count += len(nfa_transitions[from_state][symbol])
 
         automata = NFA(states=states,
                        input_symbols=input_symbols,
                        transitions=nfa_transitions,
                        initial_state=initial_state,
-                       final_states=final_states)
+                       final_states=final_states,
+                       transition_count=transition_count)
         return automata
 
     elif type_automata == 'ENFA':
         nfa_transitions = {}
+        transition_count = 0
         for from_state, transition in transitions.items():
             nfa_transitions[from_state] = {}
             for symbol, next_states in transition.items():
@@ -246,50 +618,95 @@ def create_automata(data):
                     next_states = {next_states}
                 if next_states:
                     nfa_transitions[from_state][symbol] = set(next_states)
+                    transition_count += len(nfa_transitions[from_state][symbol])
 
         automata = ENFA(states=states,
                         input_symbols=input_symbols,
                         transitions=nfa_transitions,
                         initial_state=initial_state,
-                        final_states=final_states)
+                        final_states=final_states,
+                        transition_count=transition_count)
         return automata
 
 
-def make_svg(automata):
-    graph = Digraph(format='svg')
+def accepts_batch(automata, strings):
+    # DFA dievaluasi sekaligus lewat tabel transisi, NFA/ENFA lewat cache subset construction
+    with span('accepts_batch', automata=automata, input_length=len(strings)):
+        if isinstance(automata, DFA):
+            return automata.compile().run_batch(strings)
+        lazy_dfa = automata.lazy_dfa()
+        return [lazy_dfa.accepts(input_string) for input_string in strings]
 
-    for state in automata.states:
-        if state in automata.final_states:
-            graph.node(state, shape='doublecircle')
-        else:
-            graph.node(state)
 
+# Graph dalam bentuk json ringkas untuk klien yang melakukan layout sendiri (tanpa graphviz).
+# Setiap edge berupa [asal, tujuan, label], epsilon ditulis sebagai 'ε'; langkah trace
+# berupa [asal, tujuan, jumlah, langkah pertama, langkah terakhir].
+def make_graph(automata, trace=None):
+    edges = []
     for from_state, transitions in automata.transitions.items():
         for symbol, to_states in transitions.items():
             if symbol == "":
                 symbol = "ε"
             if isinstance(automata, DFA):
-                graph.edge(from_state, to_states, label=symbol)
+                edges.append([from_state, to_states, symbol])
             else:
-                for to_state in to_states:
-                    graph.edge(from_state, to_state, label=symbol)
-
-    if automata.initial_state:
-        graph.attr('node', shape='none')
-        graph.node('')
-        graph.edge('', automata.initial_state, label="start")
-
-    svg_data = graph.pipe(format='svg').decode("utf-8")
-    soup = BeautifulSoup(svg_data, 'html.parser')
-    for tag in soup.find_all():
-        tag.attrs = {key.split(':')[-1]: value for key, value in tag.attrs.items()}
-        tag.name = tag.name.split(':')[-1]
-    cleaned_svg = str(soup)
-    return cleaned_svg
+                for to_state in sorted(to_states):
+                    edges.append([from_state, to_state, symbol])
+
+    graph = {
+        'states': sorted(automata.states),
+        'initial': automata.initial_state,
+        'accepting': sorted(automata.final_states),
+        'edges': edges,
+    }
+    if trace is not None:
+        graph['steps'] = [list(step) for step in trace.steps()]
+    return graph
+
+
+# Di atas jumlah state ini layout memakai sfdp, dot terlalu lambat untuk graph sebesar itu.
+# LARGE_GRAPH_STATES mengubah batasnya (default 200)
+LARGE_GRAPH_STATES = int(os.environ.get('LARGE_GRAPH_STATES', '200'))
+
+
+def _symbol_class(symbol):
+    if len(symbol) != 1 or not symbol.isascii():
+        return None
+    if symbol.isdigit():
+        return 'digit'
+    if symbol.isupper():
+        return 'upper'
+    if symbol.islower():
+        return 'lower'
+    return None
+
+
+# Label gabungan untuk edge paralel: ε lebih dulu, lalu simbol satu karakter terurut dengan
+# rangkaian karakter berurutan (minimal 3) dipendekkan menjadi rentang, misalnya 0-9 atau a-z,
+# lalu simbol multi-karakter
+def compress_labels(symbols):
+    symbols = sorted(set(symbols), key=lambda symbol: (symbol != 'ε', len(symbol) > 1, symbol))
+    labels = []
+    i = 0
+    while i < len(symbols):
+        j = i
+        symbol_class = _symbol_class(symbols[i])
+        while symbol_class is not None and j + 1 < len(symbols) \
+                and _symbol_class(symbols[j + 1]) == symbol_class and ord(symbols[j + 1]) == ord(symbols[j]) + 1:
+            j += 1
+        if j - i >= 2:
+            labels.append(symbols[i] + '-' + symbols[j])
+        else:
+            labels.extend(symbols[i:j + 1])
+        i = j + 1
+    return ','.join(labels)
 
 
-def draw_path(automata):
+def _diagram(automata):
     graph = Digraph(format='svg')
+    if len(automata.states) > LARGE_GRAPH_STATES:
+        graph.engine = 'sfdp'
+        graph.attr(overlap='false')
 
     for state in automata.states:
         if state in automata.final_states:
@@ -297,34 +714,112 @@ def draw_path(automata):
         else:
             graph.node(state)
 
+    # edge paralel (asal dan tujuan sama) digabung menjadi satu edge berlabel
+    merged = {}
     for from_state, transitions in automata.transitions.items():
         for symbol, to_states in transitions.items():
             if symbol == "":
                 symbol = "ε"
             if isinstance(automata, DFA):
-                graph.edge(from_state, to_states, label=symbol)
-            else:
-                for to_state in to_states:
-                    graph.edge(from_state, to_state, label=symbol)
+                to_states = [to_states]
+            for to_state in to_states:
+                merged.setdefault((from_state, to_state), []).append(symbol)
+
+    for (from_state, to_state), symbols in merged.items():
+        graph.edge(from_state, to_state, label=compress_labels(symbols))
 
     if automata.initial_state:
         graph.attr('node', shape='none')
         graph.node('')
         graph.edge('', automata.initial_state, label="start")
 
-    prev_value = ""
-    for i, value in enumerate(automata.path):
-        if i == 0:
-            prev_value = value
-            continue
-        langkah_ke = "[" + str(i) + "]"
-        graph.edge(prev_value, value, label=langkah_ke, color='green', fontcolor='blue')
-        prev_value = value
-
-    svg_data = graph.pipe(format='svg').decode("utf-8")
-    soup = BeautifulSoup(svg_data, 'html.parser')
-    for tag in soup.find_all():
-        tag.attrs = {key.split(':')[-1]: value for key, value in tag.attrs.items()}
-        tag.name = tag.name.split(':')[-1]
-    cleaned_svg = str(soup)
-    return cleaned_svg
+    return graph
+
+
+def _path_diagram(automata, steps):
+    graph = _diagram(automata)
+
+    # satu edge hijau per transisi yang dilewati, berlabel langkah dan jumlah kunjungan
+    for source, target, count, first, last in steps:
+        graph.edge(source, target, label=step_label(count, first, last), color='green', fontcolor='blue')
+
+    return graph
+
+
+# Satu svg yang akan dirender: key cache (None = tidak disimpan di cache), fungsi pembuat
+# graph, apakah hasil dot dibersihkan dengan clean_svg, dan fungsi opsional yang dijalankan
+# pada svg (dari cache maupun hasil render) sebelum dikembalikan
+class RenderJob:
+    __slots__ = ('key', 'build_graph', 'clean', 'after')
+
+    def __init__(self, key, build_graph, clean=True, after=None):
+        self.key = key
+        self.build_graph = build_graph
+        self.clean = clean
+        self.after = after
+
+    def cached(self):
+        svg = svg_cache.get(self.key) if self.key is not None else None
+        if svg is None or self.after is None:
+            return svg
+        return self.after(svg)
+
+    def finish(self, output):
+        svg = clean_svg(output) if self.clean else output
+        if self.key is not None:
+            svg_cache.put(self.key, svg)
+        return svg if self.after is None else self.after(svg)
+
+
+# Semua job yang belum ada di cache dikirim ke render_service lebih dulu, baru kemudian
+# ditunggu, sehingga dirender paralel
+def render_jobs(jobs):
+    results = [job.cached() for job in jobs]
+    futures = {}
+    for i, job in enumerate(jobs):
+        if results[i] is None:
+            graph = job.build_graph()
+            futures[i] = render_service.submit(graph.source, 'svg', graph.engine)
+
+    for i, future in futures.items():
+        results[i] = jobs[i].finish(future.result())
+    return results
+
+
+def make_svg_jobs(automatas):
+    return [RenderJob(automata_key('make_svg', automata), lambda automata=automata: _diagram(automata))
+            for automata in automatas]
+
+
+def make_svgs(automatas):
+    return render_jobs(make_svg_jobs(automatas))
+
+
+def make_svg(automata):
+    return make_svgs([automata])[0]
+
+
+def draw_path_jobs(automatas, traces, overlay=False):
+    steps = [trace.steps() if trace is not None else [] for trace in traces]
+
+    # mode overlay: layout dot dari make_svg (di-cache) dipakai ulang,
+    # langkah path digambar langsung ke svg tanpa menjalankan dot lagi.
+    # Posisi node di-parse sekali per svg dan disimpan di entry svg_cache-nya.
+    if overlay:
+        jobs = make_svg_jobs(automatas)
+        for job, automata_steps in zip(jobs, steps):
+            job.after = lambda svg, key=job.key, automata_steps=automata_steps: overlay_path(
+                svg, automata_steps, svg_cache.derived(key, svg, 'node_positions', node_positions))
+        return jobs
+
+    return [RenderJob(automata_key('draw_path', automata, automata_steps),
+                      lambda automata=automata, automata_steps=automata_steps: _path_diagram(automata, automata_steps))
+            for automata, automata_steps in zip(automatas, steps)]
+
+
+def draw_paths(automatas, traces, overlay=False):
+    return render_jobs(draw_path_jobs(automatas, traces, overlay))
+
+
+def draw_path(automata, trace=None, overlay=False):
+    return draw_paths([automata], [trace], overlay)[0]
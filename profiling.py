@@ -0,0 +1,83 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# Hanya satu request yang diprofil pada satu waktu (cProfile tidak bisa aktif bersamaan)
+_active = threading.Lock()
+
+
+class CProfileCapture:
+    def __init__(self, limit=30):
+        self.limit = limit
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        output = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=output)
+        stats.sort_stats('cumulative').print_stats(self.limit)
+        return output.getvalue()
+
+
+# Sampling stack thread request setiap interval detik; hasilnya dalam format collapsed
+# stack ("a;b;c jumlah" per baris) yang bisa langsung dibaca flamegraph.pl / speedscope
+class StackSampler:
+    def __init__(self, thread_id=None, interval=0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.counts = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name='stack-sampler', daemon=True)
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        return ''.join(f'{stack} {count}\n' for stack, count in self.counts.most_common())
+
+
+# mode 'stacks' menulis collapsed stack ke directory dan mengembalikan path file-nya,
+# mode lain mengembalikan ringkasan cProfile; None bila profiler lain sedang aktif
+def start(mode):
+    if not _active.acquire(blocking=False):
+        return None
+    capture = StackSampler() if mode == 'stacks' else CProfileCapture()
+    capture.start()
+    return capture
+
+
+def finish(capture, name, directory=None):
+    try:
+        result = capture.stop()
+    finally:
+        _active.release()
+    if isinstance(capture, StackSampler):
+        directory = directory or '.'
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{name}-{time.strftime("%Y%m%d-%H%M%S")}-{threading.get_ident()}.folded')
+        with open(path, 'w') as file:
+            file.write(result)
+        return path
+    return result
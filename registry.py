@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+from nomor_3 import hopcroft_minimize
+from nomor_5 import DFA, RenderJob, create_automata, make_svg_jobs
+from svg_cache import automata_key
+
+
+class UnknownAutomata(KeyError):
+    pass
+
+
+class _Entry:
+    __slots__ = ('automata', 'minimized', 'layout', 'expires')
+
+    def __init__(self, automata, expires):
+        self.automata = automata
+        self.minimized = None
+        self.layout = None
+        self.expires = expires
+
+
+# Job render layout; svg disimpan juga di entry sehingga tetap ada walaupun dibuang dari svg_cache
+class LayoutJob(RenderJob):
+    __slots__ = ('entry',)
+
+    def __init__(self, entry):
+        job = make_svg_jobs([entry.automata])[0]
+        super().__init__(job.key, job.build_graph)
+        self.entry = entry
+
+    def cached(self):
+        if self.entry.layout is None:
+            self.entry.layout = super().cached()
+        return self.entry.layout
+
+    def finish(self, output):
+        self.entry.layout = super().finish(output)
+        return self.entry.layout
+
+
+# Otomata yang sudah didaftarkan disimpan per id (hash isi definisinya), lengkap dengan
+# bentuk compile, hasil minimisasi dan svg layout, sehingga request berikutnya cukup
+# mengirim id. Entry dibuang bila tidak dipakai selama ttl detik atau bila jumlahnya
+# melebihi max_entries (LRU).
+class AutomataRegistry:
+    def __init__(self, max_entries=256, ttl=60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, data):
+        automata = create_automata(data)
+        automata_id = automata_key('registry', automata)
+        with self._lock:
+            self._expire()
+            if automata_id in self._entries:
+                self._touch(automata_id)
+                return automata_id
+
+        # compile di luar lock; hasilnya dipakai bersama oleh semua request
+        if isinstance(automata, DFA):
+            automata.compile()
+        else:
+            automata.lazy_dfa()
+
+        with self._lock:
+            if automata_id not in self._entries:
+                self._entries[automata_id] = _Entry(automata, time.monotonic() + self.ttl)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._touch(automata_id)
+        return automata_id
+
+    def _touch(self, automata_id):
+        self._entries.move_to_end(automata_id)
+        self._entries[automata_id].expires = time.monotonic() + self.ttl
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [automata_id for automata_id, entry in self._entries.items() if entry.expires <= now]
+        for automata_id in expired:
+            del self._entries[automata_id]
+            self.evictions += 1
+
+    def _entry(self, automata_id):
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(automata_id)
+            if entry is None:
+                raise UnknownAutomata(automata_id)
+            self._touch(automata_id)
+            return entry
+
+    # Otomata tidak diubah saat dijalankan (jejak eksekusi berupa Trace terpisah),
+    # sehingga objek yang sama aman dipakai bersama oleh banyak request
+    def get(self, automata_id):
+        return self._entry(automata_id).automata
+
+    def minimized(self, automata_id):
+        entry = self._entry(automata_id)
+        if entry.minimized is None:
+            minimized = hopcroft_minimize(entry.automata)
+            minimized.compile()
+            entry.minimized = minimized
+        return entry.minimized
+
+    def layout_job(self, automata_id):
+        return LayoutJob(self._entry(automata_id))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'evictions': self.evictions,
+            }
+
+
+registry = AutomataRegistry()
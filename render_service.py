@@ -0,0 +1,240 @@
+import asyncio
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import span
+
+
+class RenderError(RuntimeError):
+    pass
+
+
+class RenderBusy(RenderError):
+    pass
+
+
+class RenderTimeout(RenderError):
+    pass
+
+
+class RenderTooLarge(RenderError):
+    pass
+
+
+def _render_key(data, format, engine):
+    return hashlib.sha256(b'\0'.join([engine.encode(), format.encode(), data])).hexdigest()
+
+
+# Backend subprocess: satu proses dot per render, dengan timeout
+class SubprocessBackend:
+    name = 'subprocess'
+
+    def render(self, data, format, engine, timeout):
+        try:
+            process = subprocess.run([engine, '-T' + format], input=data, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RenderTimeout(f'{engine} tidak selesai dalam {timeout} detik')
+        except OSError as error:
+            raise RenderError(f'{engine} tidak bisa dijalankan: {error}')
+        if process.returncode != 0:
+            raise RenderError(process.stderr.decode('utf-8', 'replace').strip())
+        return process.stdout
+
+
+# Backend libgvc (opt-in, RENDER_BACKEND=libgvc): layout dan render di dalam proses lewat
+# ctypes, tanpa fork/exec dot. Konsekuensinya: libgvc tidak thread-safe sehingga semua render
+# antre di satu lock (pool worker dan penggabungan render praktis menjadi satu thread), timeout
+# tidak berlaku, dan abort/segfault graphviz mematikan proses server, bukan satu proses dot.
+class LibGVCBackend:
+    name = 'libgvc'
+
+    def __init__(self):
+        cgraph_path = ctypes.util.find_library('cgraph')
+        gvc_path = ctypes.util.find_library('gvc')
+        if cgraph_path is None or gvc_path is None:
+            raise OSError('libgvc/libcgraph tidak ditemukan')
+        cgraph = ctypes.CDLL(cgraph_path, mode=ctypes.RTLD_GLOBAL)
+        gvc = ctypes.CDLL(gvc_path, mode=ctypes.RTLD_GLOBAL)
+
+        cgraph.agmemread.argtypes = [ctypes.c_char_p]
+        cgraph.agmemread.restype = ctypes.c_void_p
+        cgraph.agclose.argtypes = [ctypes.c_void_p]
+        gvc.gvContext.restype = ctypes.c_void_p
+        gvc.gvLayout.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_char_p]
+        gvc.gvFreeLayout.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        # panjang hasil bertipe unsigned int pada versi lama dan size_t pada versi baru;
+        # buffer size_t yang di-nol-kan benar untuk keduanya (little endian)
+        gvc.gvRenderData.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_char_p,
+                                     ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_size_t)]
+        gvc.gvFreeRenderData.argtypes = [ctypes.c_void_p]
+
+        self._cgraph = cgraph
+        self._gvc = gvc
+        self._context = gvc.gvContext()
+        self._lock = threading.Lock()
+
+    def render(self, data, format, engine, timeout):
+        with self._lock:
+            graph = self._cgraph.agmemread(data)
+            if not graph:
+                raise RenderError('source dot tidak valid')
+            try:
+                if self._gvc.gvLayout(self._context, graph, engine.encode()) != 0:
+                    raise RenderError(f'layout {engine} gagal')
+                try:
+                    result = ctypes.c_void_p()
+                    length = ctypes.c_size_t(0)
+                    if self._gvc.gvRenderData(self._context, graph, format.encode(),
+                                              ctypes.byref(result), ctypes.byref(length)) != 0:
+                        raise RenderError(f'render {format} gagal')
+                    try:
+                        return ctypes.string_at(result, length.value)
+                    finally:
+                        self._gvc.gvFreeRenderData(result)
+                finally:
+                    self._gvc.gvFreeLayout(self._context, graph)
+            finally:
+                self._cgraph.agclose(graph)
+
+
+BACKENDS = {'subprocess': SubprocessBackend, 'libgvc': LibGVCBackend}
+
+
+# RENDER_BACKEND=subprocess (default) atau libgvc; lihat konsekuensi libgvc di atas
+def create_backend(name=None):
+    name = name or os.environ.get('RENDER_BACKEND') or 'subprocess'
+    return BACKENDS[name]()
+
+
+# Render graphviz dijalankan di pool thread yang terbatas (proses dot berjalan di luar GIL).
+# Render dengan source, format dan engine yang sama yang sedang berjalan digabung menjadi
+# satu, antrean dibatasi (RenderBusy bila penuh) dan proses dot punya timeout (backend subprocess).
+class RenderService:
+    def __init__(self, workers=None, max_queue=64, timeout=10.0,
+                 max_source_bytes=1024 * 1024, max_output_bytes=16 * 1024 * 1024, backend=None):
+        self.backend = backend or create_backend()
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_source_bytes = max_source_bytes
+        self.max_output_bytes = max_output_bytes
+        self.coalesced = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='render')
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, source, format='svg', engine='dot'):
+        data = source.encode('utf-8')
+        if len(data) > self.max_source_bytes:
+            raise RenderTooLarge(f'source dot {len(data)} byte melebihi batas {self.max_source_bytes} byte')
+
+        key = _render_key(data, format, engine)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            if len(self._inflight) >= self.workers + self.max_queue:
+                raise RenderBusy('antrean render penuh')
+            future = self._executor.submit(self._run, data, format, engine)
+            self._inflight[key] = future
+
+        future.add_done_callback(lambda _: self._finish(key))
+        return future
+
+    def _finish(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _run(self, data, format, engine):
+        with span('render', input_length=len(data)):
+            output = self.backend.render(data, format, engine, self.timeout)
+        if len(output) > self.max_output_bytes:
+            raise RenderTooLarge(f'hasil render {len(output)} byte melebihi batas {self.max_output_bytes} byte')
+        return output.decode('utf-8')
+
+    def render(self, source, format='svg', engine='dot'):
+        return self.submit(source, format, engine).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend.name,
+                'workers': self.workers,
+                'inflight': len(self._inflight),
+                'coalesced': self.coalesced,
+            }
+
+
+# Versi asyncio untuk asgi.py: proses dot dijalankan dengan asyncio.create_subprocess_exec
+# sehingga event loop tidak tertahan selama layout. Batas ukuran, timeout, penggabungan
+# render yang sama dan batas antrean sama dengan RenderService; jumlah proses dot yang
+# berjalan bersamaan dibatasi `workers`.
+class AsyncRenderService:
+    def __init__(self, workers=None, max_queue=256, timeout=10.0,
+                 max_source_bytes=1024 * 1024, max_output_bytes=16 * 1024 * 1024):
+        self.workers = workers or (os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_source_bytes = max_source_bytes
+        self.max_output_bytes = max_output_bytes
+        self.coalesced = 0
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._inflight = {}
+
+    async def render(self, source, format='svg', engine='dot'):
+        data = source.encode('utf-8')
+        if len(data) > self.max_source_bytes:
+            raise RenderTooLarge(f'source dot {len(data)} byte melebihi batas {self.max_source_bytes} byte')
+
+        key = _render_key(data, format, engine)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            if len(self._inflight) >= self.workers + self.max_queue:
+                raise RenderBusy('antrean render penuh')
+            task = asyncio.ensure_future(self._run(data, format, engine))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: request yang dibatalkan tidak ikut membatalkan render yang ditunggu request lain
+        return await asyncio.shield(task)
+
+    async def _run(self, data, format, engine):
+        async with self._semaphore:
+            with span('render', input_length=len(data)):
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        engine, '-T' + format, stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+                except OSError as error:
+                    raise RenderError(f'{engine} tidak bisa dijalankan: {error}')
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(data), self.timeout)
+                except asyncio.TimeoutError:
+                    raise RenderTimeout(f'{engine} tidak selesai dalam {self.timeout} detik')
+                finally:
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+        if process.returncode != 0:
+            raise RenderError(stderr.decode('utf-8', 'replace').strip())
+        if len(stdout) > self.max_output_bytes:
+            raise RenderTooLarge(f'hasil render {len(stdout)} byte melebihi batas {self.max_output_bytes} byte')
+        return stdout.decode('utf-8')
+
+    def stats(self):
+        return {
+            'backend': 'asyncio',
+            'workers': self.workers,
+            'inflight': len(self._inflight),
+            'coalesced': self.coalesced,
+        }
+
+
+render_service = RenderService()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+# Bentuk kanonik dari struktur otomata: set diurutkan dan key dict diubah ke string,
+# sehingga dua otomata yang sama selalu menghasilkan hash yang sama
+def _canonical(value):
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def make_key(kind, *parts):
+    payload = json.dumps([kind, _canonical(list(parts))], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def automata_key(kind, automata, path=None):
+    return make_key(kind,
+                    type(automata).__name__,
+                    automata.states,
+                    automata.input_symbols,
+                    automata.transitions,
+                    automata.initial_state,
+                    automata.final_states,
+                    path)
+
+
+class SVGCache:
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, svg):
+        size = len(svg.encode('utf-8'))
+        # svg yang lebih besar dari seluruh kapasitas tidak disimpan
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (svg, size, {})
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    # Data turunan dari svg (misalnya posisi node untuk overlay) disimpan di entry svg-nya dengan
+    # nama `name`, sehingga ikut dibuang bersama svg. compute(svg) dipanggil bila belum ada;
+    # svg yang tidak (lagi) ada di cache tidak disimpan turunannya.
+    def derived(self, key, svg, name, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is svg and name in entry[2]:
+                return entry[2][name]
+        value = compute(svg)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is svg:
+                entry[2][name] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+
+svg_cache = SVGCache()
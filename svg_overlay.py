@@ -0,0 +1,133 @@
+import html
+import math
+import re
+
+
+NODE_PATTERN = re.compile(r'<g\b[^>]*\bclass="node"[^>]*>(.*?)</g>', re.DOTALL)
+TITLE_PATTERN = re.compile(r'<title>(.*?)</title>', re.DOTALL)
+ELLIPSE_PATTERN = re.compile(r'<ellipse\b([^>]*)>')
+ATTR_PATTERN = re.compile(r'([\w:-]+)="([^"]*)"')
+
+ARROW_LENGTH = 10.0
+ARROW_HALF_WIDTH = 3.5
+
+
+# Posisi setiap state diambil dari svg hasil layout dot (cx, cy, rx, ry ellipse terluar).
+# Hasilnya disimpan pemanggil di entry svg_cache (lihat draw_path_jobs), bukan di sini,
+# supaya svg tidak ditahan di luar batas byte svg_cache.
+def node_positions(svg):
+    positions = {}
+    for match in NODE_PATTERN.finditer(svg):
+        block = match.group(1)
+        title = TITLE_PATTERN.search(block)
+        if title is None:
+            continue
+        best = None
+        for ellipse in ELLIPSE_PATTERN.finditer(block):
+            attrs = dict(ATTR_PATTERN.findall(ellipse.group(1)))
+            try:
+                cx, cy = float(attrs['cx']), float(attrs['cy'])
+                rx, ry = float(attrs['rx']), float(attrs['ry'])
+            except (KeyError, ValueError):
+                continue
+            if best is None or rx > best[2]:
+                best = (cx, cy, rx, ry)
+        if best is not None:
+            positions[html.unescape(title.group(1))] = best
+    return positions
+
+
+def _fmt(value):
+    text = '%.2f' % value
+    text = text.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _point(x, y):
+    return _fmt(x) + ',' + _fmt(y)
+
+
+def _on_ellipse(node, dx, dy):
+    # titik pada tepi ellipse node dalam arah (dx, dy)
+    cx, cy, rx, ry = node
+    scale = math.sqrt((dx / rx) ** 2 + (dy / ry) ** 2)
+    if scale == 0:
+        return cx, cy
+    return cx + dx / scale, cy + dy / scale
+
+
+def _arrow(tip_x, tip_y, from_x, from_y):
+    dx, dy = tip_x - from_x, tip_y - from_y
+    length = math.hypot(dx, dy) or 1.0
+    ux, uy = dx / length, dy / length
+    base_x, base_y = tip_x - ux * ARROW_LENGTH, tip_y - uy * ARROW_LENGTH
+    nx, ny = -uy * ARROW_HALF_WIDTH, ux * ARROW_HALF_WIDTH
+    points = ' '.join([_point(base_x + nx, base_y + ny), _point(tip_x, tip_y),
+                       _point(base_x - nx, base_y - ny), _point(base_x + nx, base_y + ny)])
+    return base_x, base_y, points
+
+
+def _edge_geometry(source, target):
+    if source == target:
+        cx, cy, rx, ry = source
+        height = 30.0
+        start = (cx - 0.5 * rx, cy - 0.87 * ry)
+        tip = (cx + 0.5 * rx, cy - 0.87 * ry)
+        control1 = (cx - rx, cy - ry - height)
+        control2 = (cx + rx, cy - ry - height)
+        base_x, base_y, arrow = _arrow(tip[0], tip[1], control2[0], control2[1])
+        path = 'M' + _point(*start) + 'C' + ' '.join([_point(*control1), _point(*control2), _point(base_x, base_y)])
+        label = (cx, start[1] * 0.25 + control1[1] * 0.75 - 4.0)
+        return path, arrow, label
+
+    dx, dy = target[0] - source[0], target[1] - source[1]
+    distance = math.hypot(dx, dy) or 1.0
+    # lengkungan selalu ke kiri arah langkah, sehingga langkah bolak-balik tidak bertumpuk
+    bend = distance * 0.25
+    control = ((source[0] + target[0]) / 2 - dy / distance * bend,
+               (source[1] + target[1]) / 2 + dx / distance * bend)
+    start = _on_ellipse(source, control[0] - source[0], control[1] - source[1])
+    tip = _on_ellipse(target, control[0] - target[0], control[1] - target[1])
+    base_x, base_y, arrow = _arrow(tip[0], tip[1], control[0], control[1])
+    path = 'M' + _point(*start) + 'Q' + ' '.join([_point(*control), _point(base_x, base_y)])
+    label = (0.25 * start[0] + 0.5 * control[0] + 0.25 * tip[0],
+             0.25 * start[1] + 0.5 * control[1] + 0.25 * tip[1])
+    return path, arrow, label
+
+
+def step_label(count, first, last):
+    if count == 1:
+        return f'[{first}]'
+    return f'[{first}..{last}] ×{count}'
+
+
+# steps berisi (asal, tujuan, jumlah, langkah pertama, langkah terakhir), satu per transisi
+# yang dilewati, sehingga jumlah edge tidak bergantung pada panjang input.
+# positions (hasil node_positions) boleh diberikan bila sudah di-parse sebelumnya.
+def overlay_path(svg, steps, positions=None, color='green', fontcolor='blue'):
+    if positions is None:
+        positions = node_positions(svg)
+    edges = []
+
+    for prev_value, value, count, first, last in steps:
+        if prev_value not in positions or value not in positions:
+            continue
+
+        d, arrow, (label_x, label_y) = _edge_geometry(positions[prev_value], positions[value])
+        title = html.escape(prev_value + '->' + value, quote=False)
+        label = html.escape(step_label(count, first, last), quote=False)
+        edges.append(
+            f'<g class="edge" id="path{first}">\n'
+            f'<title>{title}</title>\n'
+            f'<path d="{d}" fill="none" stroke="{color}"></path>\n'
+            f'<polygon fill="{color}" points="{arrow}" stroke="{color}"></polygon>\n'
+            f'<text fill="{fontcolor}" font-family="Times,serif" font-size="14.00" text-anchor="middle" '
+            f'x="{_fmt(label_x)}" y="{_fmt(label_y)}">{label}</text>\n'
+            f'</g>\n'
+        )
+
+    # path overlay disisipkan sebelum penutup <g class="graph">, sehingga ikut transformasi graph
+    graph_end = svg.rfind('</g>')
+    if graph_end == -1 or not edges:
+        return svg
+    return svg[:graph_end] + ''.join(edges) + svg[graph_end:]
@@ -0,0 +1,240 @@
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+
+from metrics import span
+
+
+# Aturan di bawah mengikuti keluaran BeautifulSoup(svg, 'html.parser') + str(soup) yang
+# sebelumnya dipakai, sehingga hasil pembersihan namespace tetap sama byte per byte.
+VOID_ELEMENTS = {
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+    'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr',
+}
+LIST_ATTRIBUTES = {
+    '*': {'class', 'accesskey', 'dropzone'},
+    'a': {'rel', 'rev'},
+    'link': {'rel', 'rev'},
+    'td': {'headers'},
+    'th': {'headers'},
+    'form': {'accept-charset'},
+    'object': {'archive'},
+    'area': {'rel'},
+    'icon': {'sizes'},
+    'iframe': {'sandbox'},
+    'output': {'for'},
+}
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+RAW_TEXT_TAGS = {'script', 'style'}
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# atribut yang isinya koordinat, dipendekkan saat minify
+COORDINATE_ATTRIBUTES = {'points', 'd', 'x', 'y', 'cx', 'cy', 'rx', 'ry', 'x1', 'x2', 'y1', 'y2',
+                         'width', 'height', 'viewbox', 'transform'}
+
+ESCAPE_PATTERN = re.compile('[<>&]')
+ESCAPES = {'<': '&lt;', '>': '&gt;', '&': '&amp;'}
+NUMBER_PATTERN = re.compile(r'-?\d+\.\d+')
+DECIMAL_REFERENCE = re.compile('^([0-9]+)(.*)')
+HEX_REFERENCE = re.compile('^([0-9a-f]+)(.*)')
+
+
+def _escape(value):
+    return ESCAPE_PATTERN.sub(lambda match: ESCAPES[match.group(0)], value)
+
+
+def _quote(value):
+    quote_with = '"'
+    if '"' in value:
+        if "'" in value:
+            value = value.replace('"', '&quot;')
+        else:
+            quote_with = "'"
+    return quote_with + value + quote_with
+
+
+def _character_reference(number):
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return '\ufffd'
+    if 0x80 <= number <= 0x9f:
+        try:
+            return bytes([number]).decode('windows-1252')
+        except UnicodeDecodeError:
+            pass
+    return chr(number)
+
+
+def _shorten_numbers(value, precision):
+    def shorten(match):
+        text = ('%.*f' % (precision, float(match.group(0)))).rstrip('0').rstrip('.')
+        return '0' if text in ('-0', '') else text
+    return NUMBER_PATTERN.sub(shorten, value)
+
+
+class SVGNamespaceStripper(HTMLParser):
+    def __init__(self, minify=False, precision=1):
+        super().__init__(convert_charrefs=False)
+        self.minify = minify
+        self.precision = precision
+        self.output = []
+        self._text = []
+        self._open_tags = []
+        self._preserve_whitespace = 0
+        self._already_closed = []
+
+    def take_output(self):
+        output = ''.join(self.output)
+        self.output = []
+        return output
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        while self._open_tags:
+            self._pop_tag()
+
+    def _collapse(self, data):
+        if not self._preserve_whitespace and all(char in ASCII_SPACES for char in data):
+            return '\n' if '\n' in data else ' '
+        return data
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        data = self._collapse(''.join(self._text))
+        self._text = []
+        if self.minify and not data.strip(ASCII_SPACES):
+            return
+        if self._open_tags and self._open_tags[-1][1] in RAW_TEXT_TAGS:
+            self.output.append(data)
+        else:
+            self.output.append(_escape(data))
+
+    def _special(self, prefix, data, suffix):
+        self._flush_text()
+        self.output.append(prefix + self._collapse(data) + suffix)
+
+    def _start_tag(self, tag, attrs):
+        list_attributes = LIST_ATTRIBUTES['*'] | LIST_ATTRIBUTES.get(tag, set())
+        values = {}
+        for key, value in attrs:
+            if value is None:
+                value = ''
+            values[key] = value
+
+        cleaned = {}
+        for key, value in values.items():
+            if key in list_attributes:
+                value = ' '.join(value.split())
+            cleaned[key.split(':')[-1]] = value
+
+        parts = [tag.split(':')[-1]]
+        for key, value in sorted(cleaned.items()):
+            if self.minify and key in COORDINATE_ATTRIBUTES:
+                value = _shorten_numbers(value, self.precision)
+            parts.append(key + '=' + _quote(_escape(value)))
+        return '<' + ' '.join(parts)
+
+    def _pop_tag(self):
+        tag, name = self._open_tags.pop()
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace -= 1
+        self.output.append('</' + name + '>')
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        opened = self._start_tag(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.output.append(opened + '/>')
+            self._already_closed.append(tag)
+            return
+        self.output.append(opened + '>')
+        self._open_tags.append((tag, tag.split(':')[-1]))
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+        opened = self._start_tag(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.output.append(opened + '/>')
+        else:
+            self.output.append(opened + '></' + tag.split(':')[-1] + '>')
+
+    def handle_endtag(self, tag):
+        if tag in self._already_closed:
+            self._already_closed.remove(tag)
+            return
+        self._flush_text()
+        if not any(open_tag == tag for open_tag, _ in self._open_tags):
+            return
+        while True:
+            open_tag = self._open_tags[-1][0]
+            self._pop_tag()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def handle_charref(self, name):
+        base, pattern = 10, DECIMAL_REFERENCE
+        if name.startswith('x') or name.startswith('X'):
+            name = name[1:]
+            base, pattern = 16, HEX_REFERENCE
+        extra_data = ''
+        try:
+            number = int(name, base)
+        except ValueError:
+            number = None
+            match = pattern.search(name)
+            if match is not None:
+                number = int(match.group(1), base)
+                extra_data = match.group(2)
+        if number is None:
+            self._text.append('')
+            self._text.append(name)
+            return
+        self._text.append(_character_reference(number))
+        self._text.append(extra_data)
+
+    def handle_entityref(self, name):
+        self._text.append(html5.get(name + ';', '&' + name))
+
+    def handle_comment(self, data):
+        if self.minify:
+            self._flush_text()
+            return
+        self._special('<!--', data, '-->')
+
+    def handle_decl(self, decl):
+        self._special('<!DOCTYPE ', decl[len('DOCTYPE '):], '>' if self.minify else '>\n')
+
+    def handle_pi(self, data):
+        self._special('<?', data, '>')
+
+    def unknown_decl(self, data):
+        if data.upper().startswith('CDATA['):
+            self._special('<![CDATA[', data[len('CDATA['):], ']]>')
+        else:
+            self._special('<?', data, '?>')
+
+
+# Membersihkan prefix namespace (svg:, xlink:) dari tag dan atribut dalam satu kali baca.
+# chunks boleh berupa iterable potongan svg, hasil dikeluarkan sedikit demi sedikit.
+def stream_clean_svg(chunks, minify=False, precision=1):
+    parser = SVGNamespaceStripper(minify=minify, precision=precision)
+    for chunk in chunks:
+        parser.feed(chunk)
+        output = parser.take_output()
+        if output:
+            yield output
+    parser.close()
+    output = parser.take_output()
+    if output:
+        yield output
+
+
+def clean_svg(svg_data, minify=False, precision=1):
+    with span('clean_svg', input_length=len(svg_data)):
+        return ''.join(stream_clean_svg([svg_data], minify=minify, precision=precision))
@@ -0,0 +1,49 @@
+from itertools import product
+
+import pytest
+
+import generators
+from nomor_4 import equivalent_with_witness
+from nomor_5 import create_automata
+
+MAX_LENGTH = 8
+
+
+# String pembeda terpendek lewat enumerasi semua string sampai MAX_LENGTH, None bila tidak ada
+def brute_force_witness(dfa1, dfa2, symbols):
+    for length in range(MAX_LENGTH + 1):
+        for letters in product(symbols, repeat=length):
+            string = ''.join(letters)
+            if dfa1.accepts_input(string) != dfa2.accepts_input(string):
+                return string
+    return None
+
+
+# state sedikit dan alfabet kecil, sehingga string pembeda (bila ada) lebih pendek dari MAX_LENGTH
+CASES = [(n1, n2, k, seed) for n1, n2 in ((1, 2), (2, 3), (3, 3), (4, 2)) for k in (1, 2) for seed in range(10)]
+
+
+@pytest.mark.parametrize('n1, n2, k, seed', CASES)
+def test_witness_is_shortest_distinguishing_string(n1, n2, k, seed):
+    dfa1 = create_automata(generators.random_dfa(n1, k, seed))
+    dfa2 = create_automata(generators.random_dfa(n2, k, seed + 100))
+    expected = brute_force_witness(dfa1, dfa2, generators.alphabet(k))
+
+    result, witness = equivalent_with_witness(dfa1, dfa2)
+    assert result == (expected is None)
+    if expected is not None:
+        assert len(witness) == len(expected)
+        assert dfa1.accepts_input(witness) != dfa2.accepts_input(witness)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_dfa_is_equivalent_to_its_copy_with_renamed_states(seed):
+    data = generators.random_dfa(6, 2, seed)
+    renamed = dict(data,
+                   states=['p' + state for state in data['states']],
+                   transitions={'p' + state: {symbol: ['p' + target for target in targets]
+                                              for symbol, targets in transitions.items()}
+                                for state, transitions in data['transitions'].items()},
+                   start_state='p' + data['start_state'],
+                   accepting_states=['p' + state for state in data['accepting_states']])
+    assert equivalent_with_witness(create_automata(data), create_automata(renamed)) == (True, None)
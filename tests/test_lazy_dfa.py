@@ -0,0 +1,53 @@
+from itertools import product
+
+import pytest
+
+import generators
+from nomor_5 import LazyDFA, create_automata
+
+
+def all_strings(symbols, max_length):
+    for length in range(max_length + 1):
+        for letters in product(symbols, repeat=length):
+            yield ''.join(letters)
+
+
+CASES = [('NFA', seed) for seed in range(5)] + [('ENFA', seed) for seed in range(5)]
+
+
+def random_automata(kind, seed):
+    if kind == 'NFA':
+        return create_automata(generators.random_nfa(8, 2, seed, branching=3))
+    return create_automata(generators.random_enfa(8, 2, seed, branching=3, epsilon_ratio=0.4))
+
+
+# max_states=3 memaksa cache dibuang berkali-kali; hasilnya harus sama dengan lazy DFA tanpa batas
+@pytest.mark.parametrize('kind, seed', CASES)
+def test_lazy_dfa_after_flush(kind, seed):
+    automata = random_automata(kind, seed)
+    compiled = automata.compile()
+    small = LazyDFA(compiled, max_states=3)
+    unbounded = LazyDFA(compiled, max_states=1 << 20)
+
+    for string in all_strings(['a', 'b'], 7):
+        assert small.accepts(string) == unbounded.accepts(string), string
+        assert small.accepts_with_path(string) == unbounded.accepts_with_path(string), string
+    # setelah flush: state mati, state awal, state yang sedang aktif dan state tujuannya
+    assert small.stats()['states'] <= 4
+    assert unbounded.stats()['flushes'] == 0
+
+
+def test_flush_is_counted():
+    automata = random_automata('NFA', 0)
+    lazy_dfa = LazyDFA(automata.compile(), max_states=3)
+    for string in all_strings(['a', 'b'], 7):
+        lazy_dfa.accepts(string)
+    assert lazy_dfa.stats()['flushes'] > 0
+
+
+def test_invalidate_drops_lazy_dfa():
+    automata = random_automata('ENFA', 1)
+    lazy_dfa = automata.lazy_dfa()
+    assert automata.lazy_dfa() is lazy_dfa
+    automata.invalidate()
+    assert automata.lazy_dfa() is not lazy_dfa
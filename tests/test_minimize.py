@@ -0,0 +1,50 @@
+import random
+from itertools import product
+
+import pytest
+
+import generators
+from nomor_3 import hopcroft_minimize, minimize_dfa, remove_unreachable_states
+from nomor_5 import create_automata
+
+
+def all_strings(symbols, max_length):
+    for length in range(max_length + 1):
+        for letters in product(symbols, repeat=length):
+            yield ''.join(letters)
+
+
+CASES = [(n, k, seed) for n in (1, 2, 5, 12, 30) for k in (1, 2, 3) for seed in range(4)]
+
+
+@pytest.mark.parametrize('n, k, seed', CASES)
+def test_hopcroft_matches_table_filling(n, k, seed):
+    dfa = create_automata(generators.random_dfa(n, k, seed))
+    table = minimize_dfa(dfa)
+    hopcroft = hopcroft_minimize(dfa)
+
+    # DFA acak selalu lengkap, sehingga kedua algoritma menghasilkan jumlah state yang sama
+    assert len(hopcroft.states) == len(table.states)
+    assert len(hopcroft.states) <= len(remove_unreachable_states(dfa, dfa.initial_state))
+    for string in all_strings(generators.alphabet(k), 6):
+        expected = dfa.accepts_input(string)
+        assert table.accepts_input(string) == expected
+        assert hopcroft.accepts_input(string) == expected
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_hopcroft_keeps_language_of_partial_dfa(seed):
+    # sebagian transisi dihapus; table filling hanya menerima DFA lengkap, jadi dibandingkan
+    # langsung dengan DFA asalnya
+    data = generators.random_dfa(8, 2, seed)
+    rng = random.Random(seed)
+    for transitions in data['transitions'].values():
+        for symbol in transitions:
+            if rng.random() < 0.3:
+                transitions[symbol] = []
+    dfa = create_automata(data)
+    hopcroft = hopcroft_minimize(dfa)
+
+    assert len(hopcroft.states) <= len(remove_unreachable_states(dfa, dfa.initial_state))
+    for string in all_strings(['a', 'b'], 7):
+        assert hopcroft.accepts_input(string) == dfa.accepts_input(string)
@@ -0,0 +1,75 @@
+from itertools import product
+
+import pytest
+
+import generators
+from nomor_5 import create_automata
+
+
+def all_strings(symbols, max_length):
+    for length in range(max_length + 1):
+        for letters in product(symbols, repeat=length):
+            yield ''.join(letters)
+
+
+# Simulasi himpunan state biasa: epsilon closure dengan DFS, lalu transisi per simbol
+def reference_closure(data, states):
+    closure = set(states)
+    stack = list(states)
+    while stack:
+        state = stack.pop()
+        for next_state in data['transitions'].get(state, {}).get('', []):
+            if next_state not in closure:
+                closure.add(next_state)
+                stack.append(next_state)
+    return closure
+
+
+def reference_accepts(data, string):
+    current = reference_closure(data, {data['start_state']})
+    for symbol in string:
+        moved = set()
+        for state in current:
+            moved.update(data['transitions'].get(state, {}).get(symbol, []))
+        current = reference_closure(data, moved)
+    return bool(current & set(data['accepting_states']))
+
+
+CASES = [(n, seed) for n in (1, 3, 8, 20) for seed in range(5)]
+
+
+@pytest.mark.parametrize('n, seed', CASES)
+def test_nfa_matches_reference(n, seed):
+    data = generators.random_nfa(n, 2, seed)
+    nfa = create_automata(data)
+    for string in all_strings(['a', 'b'], 6):
+        assert nfa.accepts_input(string) == reference_accepts(data, string), string
+
+
+# epsilon_ratio tinggi membuat siklus epsilon (SCC berisi beberapa state) dan rantai panjang
+@pytest.mark.parametrize('epsilon_ratio', [0.2, 0.6, 1.0])
+@pytest.mark.parametrize('n, seed', CASES)
+def test_enfa_matches_reference(n, seed, epsilon_ratio):
+    data = generators.random_enfa(n, 2, seed, epsilon_ratio=epsilon_ratio)
+    enfa = create_automata(data)
+    for state in data['states']:
+        assert enfa.epsilon_closure({state}) == reference_closure(data, {state})
+    for string in all_strings(['a', 'b'], 6):
+        assert enfa.accepts_input(string) == reference_accepts(data, string), string
+        assert enfa.trace(string).accepted == reference_accepts(data, string), string
+
+
+def test_enfa_epsilon_cycle():
+    data = {
+        'type': 'ENFA',
+        'states': ['q0', 'q1', 'q2', 'q3'],
+        'alphabet': ['a'],
+        'transitions': {'q0': {'': ['q1']}, 'q1': {'': ['q2']}, 'q2': {'': ['q0'], 'a': ['q3']}},
+        'start_state': 'q0',
+        'accepting_states': ['q3'],
+    }
+    enfa = create_automata(data)
+    assert enfa.epsilon_closure({'q1'}) == {'q0', 'q1', 'q2'}
+    assert enfa.accepts_input('a')
+    assert not enfa.accepts_input('')
+    assert not enfa.accepts_input('aa')
@@ -0,0 +1,53 @@
+import re
+from itertools import product
+
+import pytest
+
+import generators
+from nomor_2 import MAX_REGEX_LENGTH, RegexSyntaxError, compile_regex, regex_automata
+
+
+def all_strings(symbols, max_length):
+    for length in range(max_length + 1):
+        for letters in product(symbols, repeat=length):
+            yield ''.join(letters)
+
+
+# Sintaks nomor_2 memakai + untuk union, pada modul re ditulis |
+def python_regex(pattern):
+    return re.compile(pattern.replace('+', '|'))
+
+
+# regex acak atas huruf a-c, sebagian huruf diganti angka supaya simbol angka ikut diuji
+DIGITS = str.maketrans('bc', '01')
+PATTERNS = [generators.random_regex(operators, 3, seed) for operators in (0, 1, 3, 6, 10) for seed in range(6)]
+PATTERNS += [pattern.translate(DIGITS) for pattern in PATTERNS]
+PATTERNS += ['(a+0)*1', '((a)*)*', '7(7+8)*9']
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_regex_to_dfa_matches_python_re(pattern):
+    expected = python_regex(pattern)
+    dfa = regex_automata(pattern, engine='dfa')
+    minimized = regex_automata(pattern, engine='dfa', minimize=True)
+    matcher = compile_regex(pattern)
+
+    symbols = sorted(set(re.sub('[^a-z0-9]', '', pattern)) | {'a', '0'})
+    for string in all_strings(symbols, 5):
+        accepted = expected.fullmatch(string) is not None
+        assert dfa.accepts_input(string) == accepted, string
+        assert minimized.accepts_input(string) == accepted, string
+        assert matcher.accepts(string) == accepted, string
+
+
+@pytest.mark.parametrize('pattern', ['a+', '+a', '(ab', 'ab)', '*', 'a-b', 'a b', '()'])
+def test_malformed_regex_raises_value_error(pattern):
+    with pytest.raises(RegexSyntaxError):
+        regex_automata(pattern, engine='dfa')
+    with pytest.raises(RegexSyntaxError):
+        compile_regex(pattern)
+
+
+def test_compile_regex_rejects_long_pattern():
+    with pytest.raises(RegexSyntaxError):
+        compile_regex('a' * (MAX_REGEX_LENGTH + 1))
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+import generators
+import nomor_5
+from nomor_5 import create_automata
+
+
+# Simulasi DFA langsung pada dict transisi, string diberikan sebagai list simbol
+def reference_accepts(data, symbols):
+    state = data['start_state']
+    for symbol in symbols:
+        next_states = data['transitions'].get(state, {}).get(symbol)
+        if not next_states:
+            return False
+        state = next_states[0]
+    return state in data['accepting_states']
+
+
+def with_alphabet(data, symbols):
+    # simbol generator diganti dengan simbol lain (misalnya multi-karakter) dengan urutan yang sama
+    mapping = dict(zip(data['alphabet'], symbols))
+    return dict(data,
+                alphabet=list(symbols),
+                transitions={state: {mapping[symbol]: targets for symbol, targets in row.items()}
+                             for state, row in data['transitions'].items()})
+
+
+# String acak sebagai list simbol, beberapa diberi karakter di luar alfabet ('!') dan
+# panjangnya bervariasi (termasuk string kosong) supaya padding dan potongan ikut diuji
+def random_inputs(symbols, count, seed):
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        string = [rng.choice(symbols) for _ in range(rng.randint(0, 30))]
+        if string and rng.random() < 0.2:
+            string.insert(rng.randrange(len(string)), '!')
+        inputs.append(string)
+    return inputs
+
+
+def check_batch(data, symbols, seed, max_cells=1 << 22):
+    dfa = create_automata(data)
+    inputs = random_inputs(symbols, 200, seed)
+    strings = [''.join(string) for string in inputs]
+    expected = [reference_accepts(data, string) for string in inputs]
+    compiled = dfa.compile()
+    assert [compiled.run(string) for string in strings] == expected
+    assert compiled.run_batch(strings, max_cells=max_cells) == expected
+
+
+@pytest.mark.parametrize('k', [1, 2, 16, 64])
+@pytest.mark.parametrize('seed', range(3))
+def test_run_batch_matches_reference(k, seed):
+    data = generators.random_dfa(20, k, seed)
+    check_batch(data, data['alphabet'], seed)
+
+
+@pytest.mark.parametrize('max_cells', [1, 7, 100])
+def test_run_batch_in_small_chunks(max_cells):
+    data = generators.random_dfa(10, 3, 1)
+    check_batch(data, data['alphabet'], 1, max_cells=max_cells)
+
+
+def test_run_batch_multi_character_alphabet():
+    symbols = ['x' + str(i) for i in range(12)]
+    data = with_alphabet(generators.random_dfa(15, 12, 2), symbols)
+    check_batch(data, symbols, 2)
+
+
+def test_run_batch_more_than_255_symbols():
+    # lebih dari 255 simbol: matriks langkah memakai int32, bukan uint8
+    symbols = [chr(0x100 + i) for i in range(300)]
+    data = generators.random_dfa(10, 1, 3)
+    rng = random.Random(3)
+    data = dict(data, alphabet=symbols,
+                transitions={state: {symbol: [rng.choice(data['states'])] for symbol in symbols}
+                             for state in data['states']})
+    check_batch(data, symbols, 3)
+
+
+def test_run_batch_without_numpy(monkeypatch):
+    monkeypatch.setattr(nomor_5, 'np', None)
+    data = generators.random_dfa(20, 4, 4)
+    check_batch(data, data['alphabet'], 4)
+
+
+def test_run_batch_empty_list():
+    assert create_automata(generators.random_dfa(5, 2)).compile().run_batch([]) == []
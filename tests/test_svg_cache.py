@@ -0,0 +1,45 @@
+from svg_cache import SVGCache
+from svg_overlay import node_positions
+
+
+SVG = ('<svg><g class="graph"><g class="node"><title>q0</title>'
+       '<ellipse cx="27" cy="-45" rx="27" ry="18"></ellipse></g></g></svg>')
+
+
+def counting(function):
+    calls = []
+
+    def wrapper(svg):
+        calls.append(svg)
+        return function(svg)
+    return wrapper, calls
+
+
+def test_derived_is_computed_once_per_entry():
+    cache = SVGCache()
+    cache.put('key', SVG)
+    svg = cache.get('key')
+    compute, calls = counting(node_positions)
+    assert cache.derived('key', svg, 'node_positions', compute) == {'q0': (27.0, -45.0, 27.0, 18.0)}
+    assert cache.derived('key', cache.get('key'), 'node_positions', compute) == {'q0': (27.0, -45.0, 27.0, 18.0)}
+    assert len(calls) == 1
+
+
+def test_derived_is_dropped_with_its_entry():
+    cache = SVGCache(max_entries=1)
+    cache.put('key', SVG)
+    compute, calls = counting(node_positions)
+    cache.derived('key', cache.get('key'), 'node_positions', compute)
+    cache.put('other', SVG + ' ')
+    cache.put('key', SVG)
+    cache.derived('key', cache.get('key'), 'node_positions', compute)
+    assert len(calls) == 2
+
+
+def test_derived_of_uncached_svg_is_not_stored():
+    cache = SVGCache()
+    compute, calls = counting(node_positions)
+    cache.derived('key', SVG, 'node_positions', compute)
+    cache.derived('key', SVG, 'node_positions', compute)
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 0
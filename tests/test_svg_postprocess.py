@@ -0,0 +1,60 @@
+import pytest
+
+from svg_postprocess import clean_svg, stream_clean_svg
+
+bs4 = pytest.importorskip('bs4')
+# svg memang diparse dengan html.parser, sama seperti kode lama
+pytestmark = pytest.mark.filterwarnings('ignore::bs4.XMLParsedAsHTMLWarning')
+
+
+# Contoh keluaran dot -Tsvg (dipotong), termasuk prefix namespace, entity, dan komentar
+SAMPLE_SVG = '''<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN"
+ "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">
+<!-- Generated by graphviz version 2.43.0 (0)
+ -->
+<!-- Title: %3 Pages: 1 -->
+<svg:svg width="206pt" height="98pt"
+ viewBox="0.00 0.00 206.00 98.00" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+<svg:g id="graph0" class="graph  main" transform="scale(1 1) rotate(0) translate(4 94)">
+<title>%3</title>
+<polygon fill="white" stroke="transparent" points="-4,4 -4,-94 202,-94 202,4 -4,4"/>
+<!-- q0 -->
+<g id="node1" class="node">
+<title>q0</title>
+<a xlink:href="#q0" xlink:title="state &lt;q0&gt; &amp; &quot;start&quot;">
+<ellipse fill="none" stroke="black" cx="27" cy="-45" rx="27" ry="18"/>
+<text text-anchor="middle" x="27" y="-41.3" font-family="Times,serif" font-size="14.00">q0</text>
+</a>
+</g>
+<!-- q0&#45;&gt;q1 -->
+<g id="edge1" class="edge">
+<title>q0&#45;&gt;q1</title>
+<path fill="none" stroke="black" d="M54.25,-45C69.46,-45 88.96,-45 105.72,-45"/>
+<polygon fill="black" stroke="black" points="105.83,-48.5 115.83,-45 105.83,-41.5 105.83,-48.5"/>
+<text text-anchor="middle" x="85" y="-48.8" font-family="Times,serif" font-size="14.00">a &#x3b5; &epsilon;</text>
+</g>
+<g id="node2" class="node"><title>q1</title><ellipse fill="none" stroke="black" cx="171" cy="-45" rx="27" ry="18"/></g>
+</svg:g>
+</svg:svg>
+'''
+
+
+# Pembersihan namespace versi lama (sebelum svg_postprocess), sebagai acuan
+def beautifulsoup_clean(svg_data):
+    soup = bs4.BeautifulSoup(svg_data, 'html.parser')
+    for tag in soup.find_all():
+        tag.attrs = {key.split(':')[-1]: value for key, value in tag.attrs.items()}
+        tag.name = tag.name.split(':')[-1]
+    return str(soup)
+
+
+def test_clean_svg_matches_beautifulsoup():
+    assert clean_svg(SAMPLE_SVG) == beautifulsoup_clean(SAMPLE_SVG)
+
+
+def test_stream_clean_svg_matches_beautifulsoup_for_any_chunking():
+    expected = beautifulsoup_clean(SAMPLE_SVG)
+    for size in (1, 7, 64, 1000):
+        chunks = [SAMPLE_SVG[i:i + size] for i in range(0, len(SAMPLE_SVG), size)]
+        assert ''.join(stream_clean_svg(chunks)) == expected
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from nomor_5 import SymbolTokenizer, create_automata
+
+
+# Longest match sederhana: di setiap posisi coba simbol dari yang terpanjang
+def reference_tokenize(symbols, string):
+    tokens = []
+    index = 0
+    while index < len(string):
+        for symbol in sorted(symbols, key=len, reverse=True):
+            if string.startswith(symbol, index):
+                tokens.append(symbol)
+                index += len(symbol)
+                break
+        else:
+            tokens.append(None)
+            return tokens
+    return tokens
+
+
+def tokenize(symbols, string):
+    tokenizer = SymbolTokenizer(symbols)
+    return [None if symbol_id is None else tokenizer.symbols[symbol_id]
+            for symbol_id in tokenizer.tokenize(string)]
+
+
+def test_longest_match():
+    symbols = ['a', 'ab', 'abc', 'b', 'c']
+    assert tokenize(symbols, 'abcab') == ['abc', 'ab']
+    assert tokenize(symbols, 'abca') == ['abc', 'a']
+    assert tokenize(symbols, 'bca') == ['b', 'c', 'a']
+    assert tokenize(symbols, '') == []
+
+
+def test_longest_match_falls_back_to_shorter_prefix():
+    # 'ab' cocok walaupun 'abc' hanya cocok sebagian ('abd')
+    assert tokenize(['ab', 'abc', 'd'], 'abd') == ['ab', 'd']
+
+
+def test_invalid_input_stops_tokenizing():
+    assert tokenize(['a', 'ab'], 'abxa') == ['ab', None]
+    assert tokenize(['ab'], 'a') == [None]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_tokenizer_matches_reference(seed):
+    rng = random.Random(seed)
+    symbols = list({''.join(rng.choice('abc') for _ in range(rng.randint(1, 3))) for _ in range(6)})
+    for _ in range(50):
+        string = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 12)))
+        assert tokenize(symbols, string) == reference_tokenize(symbols, string), (symbols, string)
+
+
+def test_dfa_with_multi_character_alphabet():
+    dfa = create_automata({
+        'type': 'DFA',
+        'states': ['q0', 'q1', 'q2'],
+        'alphabet': ['a', 'ab', 'b'],
+        'transitions': {'q0': {'a': ['q0'], 'ab': ['q1'], 'b': ['q2']}, 'q1': {'a': ['q2'], 'b': ['q1']}, 'q2': {}},
+        'start_state': 'q0',
+        'accepting_states': ['q1'],
+    })
+    assert dfa.accepts_input('aab')
+    assert dfa.accepts_input('abb')
+    assert not dfa.accepts_input('ab' + 'a')
+    assert not dfa.accepts_input('abc')
+    assert dfa.trace('aab').path == ['q0', 'q0', 'q1']